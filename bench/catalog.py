@@ -0,0 +1,107 @@
+"""
+Synthetic catalogs for merge scaling tests.
+
+generate(scale) returns the four inputs of merge_fruits_with_averages built from
+the info catalog, with every fruit repeated `scale` times under a made-up suffix
+("Rocket", "Rocket Kari", "Rocket Zomu", ...). Each copy keeps the original
+fruit's skins, so fruit and skin counts both grow linearly with `scale`. The
+quirks the merge has to cope with are kept at every size:
+
+- fruity spells some names differently (case, "T Rex" for "T-Rex") and repeats some items
+- fruity uses Rumble where BFV and info use Lightning (FRUIT_ALIASES)
+- BFV has East/West Dragon while info files the skins under Dragon
+- BFV skins are "<skin> <fruit>", sometimes "<fruit> <skin>", sometimes the bare
+  skin name (resolved through info), and a few never resolve
+
+    python bench/catalog.py 10 /tmp/catalog   # write the inputs as JSON files
+"""
+import json
+import os
+import random
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+SYLLABLES = ["ka", "ri", "zo", "mu", "te", "la", "vo", "ne", "shi", "da"]
+TRENDS = ["Stable", "Rising", "Dropping", "Overpaid", "Underpaid"]
+
+def base_info():
+    """The static fruit catalog as plain (mutable) dicts."""
+    from src.catalog import catalog
+    return json.loads(catalog().body)
+
+def _suffix(i: int) -> str:
+    """A unique letters-only word for copy i (names are normalized to letters, so digits would collide)."""
+    digits = []
+    while True:
+        i, d = divmod(i, len(SYLLABLES))
+        digits.append(SYLLABLES[d])
+        if i == 0:
+            break
+    if len(digits) < 2:
+        digits.append(SYLLABLES[0])
+    return "".join(digits).capitalize()
+
+def _copy_name(name: str, i: int) -> str:
+    return name if i == 0 else f"{name} {_suffix(i)}"
+
+def generate(scale: int, seed: int = 0, info=None):
+    """Return (fruits_bfv, fruits_fruity, fruits_info, bfv_skins) at `scale` times today's catalog."""
+    rnd = random.Random(seed)
+    info = info if info is not None else base_info()
+    fruits_bfv, fruits_fruity, fruits_info, bfv_skins = [], [], [], []
+
+    for i in range(scale):
+        for n, base in enumerate(info):
+            name = _copy_name(base["name"], i)
+            skins = [dict(s, name=_copy_name(s["name"], i)) for s in (base.get("skins") or [])]
+            fruits_info.append(dict(base, name=name, skins=skins))
+
+            reg = int((base.get("price") or 5000) * rnd.uniform(20, 120))
+            bfv_names = [name]
+            if base["name"] == "Dragon":
+                bfv_names = [_copy_name("East Dragon", i), _copy_name("West Dragon", i)]
+            for bname in bfv_names:
+                fruits_bfv.append({
+                    "name": bname, "category": "Fruits",
+                    "regValue": reg, "permValue": reg * rnd.randint(2, 6),
+                    "robuxPrice": base.get("robux_price") or 0, "beliPrice": base.get("price") or 0,
+                    "rarity": base.get("rarity", ""), "regTrend": rnd.choice(TRENDS), "permTrend": rnd.choice(TRENDS),
+                    "fruitType": base.get("type", ""), "tradeable": True,
+                    "awakeningPrice": {k: rnd.choice([0, 500, 1000]) for k in "zxcvf"} if base.get("awakening") else None,
+                })
+
+            fname = name.replace("Lightning", "Rumble").replace("T-Rex", "T Rex")
+            if n % 3 == 0:
+                fname = fname.upper()
+            entry = {"name": fname, "regValueNumeric": int(reg * rnd.uniform(0.8, 1.2)),
+                     "permValueNumeric": reg * 4, "robuxPrice": base.get("robux_price") or 0}
+            fruits_fruity.append(entry)
+            if n % 7 == 0:
+                fruits_fruity.append(dict(entry, regValueNumeric=int(reg * rnd.uniform(0.8, 1.2))))
+
+            for k, s in enumerate(skins):
+                if k % 11 == 5:
+                    sname = s["name"]                      # bare skin name, resolved through info
+                elif k % 5 == 3:
+                    sname = f"{name} {s['name']}"
+                else:
+                    sname = f"{s['name']} {name}"
+                bfv_skins.append({"name": sname, "category": "Skins", "regValue": rnd.randint(1, 200) * 100_000,
+                                  "robuxPrice": rnd.choice([0, 0, 1200]), "regTrend": rnd.choice(TRENDS), "tradeable": True})
+        bfv_skins.append({"name": f"Mystery {_suffix(i)} Shard", "category": "Skins", "regValue": 100_000, "tradeable": False})
+
+    return fruits_bfv, fruits_fruity, fruits_info, bfv_skins
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        print(__doc__)
+        sys.exit(2)
+    out_dir = sys.argv[2]
+    os.makedirs(out_dir, exist_ok=True)
+    parts = generate(int(sys.argv[1]))
+    for name, data in zip(("fruits_bfv", "fruits_fruity", "fruits_info", "bfv_skins"), parts):
+        with open(os.path.join(out_dir, f"{name}.json"), "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2, ensure_ascii=False)
+        print(f"{name}: {len(data)} items")
@@ -0,0 +1,79 @@
+"""
+Merge scaling: time and peak memory of merge_fruits_with_averages against
+catalog size, on synthetic catalogs from bench/catalog.py.
+
+    python bench/scaling.py [--scales 1 5 10 25 50 100] [--csv scaling.csv]
+
+The `growth` column is the local exponent between consecutive sizes
+(log time ratio / log size ratio): ~1 is linear, ~2 quadratic.
+"""
+import argparse
+import contextlib
+import csv
+import io
+import math
+import sys
+import time
+import tracemalloc
+
+from catalog import base_info, generate
+
+def run(scale: int, repeat: int, info) -> dict:
+    from src.all import merge_fruits_with_averages
+    fruits_bfv, fruits_fruity, fruits_info, bfv_skins = generate(scale, info=info)
+    with contextlib.redirect_stdout(io.StringIO()):  # the unmatched-skins report is long at scale
+        times = []
+        for _ in range(repeat):
+            t = time.perf_counter()
+            merged = merge_fruits_with_averages(fruits_bfv, fruits_fruity, fruits_info, bfv_skins)
+            times.append(time.perf_counter() - t)
+        tracemalloc.start()
+        merge_fruits_with_averages(fruits_bfv, fruits_fruity, fruits_info, bfv_skins)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return {
+        "scale": scale,
+        "fruits": len(fruits_info),
+        "skins": len(bfv_skins),
+        "merged": len(merged),
+        "seconds": round(min(times), 4),
+        "peak_mb": round(peak / 2**20, 2),
+    }
+
+def chart(rows, key: str, width: int = 50) -> str:
+    top = max(r[key] for r in rows) or 1
+    return "\n".join(f"{r['scale']:>5}x |{'#' * max(1, round(r[key] / top * width)):<{width}}| {r[key]}" for r in rows)
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--scales", type=int, nargs="+", default=[1, 5, 10, 25, 50, 100])
+    ap.add_argument("--repeat", type=int, default=3, help="timed runs per size (the minimum is kept)")
+    ap.add_argument("--csv", help="also write the table to this CSV file")
+    args = ap.parse_args()
+
+    info = base_info()
+    rows = []
+    for scale in args.scales:
+        row = run(scale, args.repeat if scale <= 10 else 1, info)
+        if rows:
+            prev = rows[-1]
+            ratio = row["skins"] / prev["skins"]
+            row["growth"] = round(math.log(row["seconds"] / prev["seconds"]) / math.log(ratio), 2) if ratio > 1 else ""
+        else:
+            row["growth"] = ""
+        rows.append(row)
+        print(row, flush=True)
+
+    print("\nmerge time (s)")
+    print(chart(rows, "seconds"))
+    print("\npeak memory (MiB)")
+    print(chart(rows, "peak_mb"))
+
+    if args.csv:
+        with open(args.csv, "w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=list(rows[0]))
+            writer.writeheader()
+            writer.writerows(rows)
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,75 @@
+"""
+JSON encoding: encode/decode time and size of the merged /all document with
+the encoders the service used before (stdlib json, indent=2) and the ones
+src/serializer.py picks now (orjson when installed, compact by default).
+
+    python bench/serialize.py [--scales 1 10] [--min-time 0.5]
+
+Documents are merged from synthetic catalogs (bench/catalog.py), so scale 1 is
+about today's /all.
+"""
+import argparse
+import contextlib
+import io
+import json
+import time
+
+from catalog import base_info, generate
+
+def document(scale: int, info) -> dict:
+    from src.all import merge_fruits_with_averages
+    fruits_bfv, fruits_fruity, fruits_info, bfv_skins = generate(scale, info=info)
+    with contextlib.redirect_stdout(io.StringIO()):
+        fruits = merge_fruits_with_averages(fruits_bfv, fruits_fruity, fruits_info, bfv_skins)
+    return {"stock": {"normal": [f["name"] for f in fruits[:6]], "mirage": [f["name"] for f in fruits[6:13]]},
+            "fruits": fruits, "gamepasses": [], "specials": [], "sources": {}}
+
+def encoders():
+    """(name, encode, decode) for the previous behaviour and for every serializer backend."""
+    from src import serializer
+
+    out = [("stdlib indent=2 (before)",
+            lambda d: json.dumps(d, indent=2, ensure_ascii=False).encode("utf-8"), json.loads)]
+    backends = ["json"] + (["orjson"] if serializer.orjson is not None else [])
+    for backend in backends:
+        for pretty in (False, True):
+            def encode(d, backend=backend, pretty=pretty):
+                serializer.BACKEND = backend
+                return serializer.dumps(d, pretty=pretty)
+
+            def decode(b, backend=backend):
+                serializer.BACKEND = backend
+                return serializer.loads(b)
+
+            out.append((f"{backend} {'pretty' if pretty else 'compact'}", encode, decode))
+    return out
+
+def timed(fn, arg, min_time: float) -> float:
+    """Best per-call time over repeated calls for at least min_time seconds."""
+    best, spent = float("inf"), 0.0
+    while spent < min_time:
+        t = time.perf_counter()
+        fn(arg)
+        dt = time.perf_counter() - t
+        best, spent = min(best, dt), spent + dt
+    return best
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--scales", type=int, nargs="+", default=[1, 10])
+    ap.add_argument("--min-time", type=float, default=0.5, help="seconds spent on each measurement")
+    args = ap.parse_args()
+
+    info = base_info()
+    for scale in args.scales:
+        doc = document(scale, info)
+        print(f"\nscale {scale}: {len(doc['fruits'])} fruits")
+        print(f"{'encoder':28} {'encode ms':>10} {'decode ms':>10} {'bytes':>10}")
+        for name, encode, decode in encoders():
+            body = encode(doc)
+            assert decode(body) == json.loads(body)
+            enc, dec = timed(encode, doc, args.min_time), timed(decode, body, args.min_time)
+            print(f"{name:28} {enc * 1000:10.2f} {dec * 1000:10.2f} {len(body):10}")
+
+if __name__ == "__main__":
+    main()
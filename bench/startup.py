@@ -0,0 +1,83 @@
+"""
+Cold start: import time of the web app and time to first byte after a restart.
+
+    python bench/startup.py [--runs 5]
+
+Import time is measured in fresh interpreters. Time to first byte is measured from
+process spawn to the first /all response, with a storage/ whose files are all
+past their TTL (a container restarted after a while), with and without FAST_START.
+Upstream pages come from the bench/fixtures stand-in server, as in bench/suite.py,
+with --upstream-delay seconds of simulated latency per upstream request.
+"""
+import argparse
+import http.client
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from throughput import ROOT, build_storage, free_port
+
+BENCH = os.path.dirname(os.path.abspath(__file__))
+IMPORT = "import time; t = time.perf_counter(); import src.flask; print(time.perf_counter() - t)"
+SERVE = ("import sys; sys.path.insert(0, {bench!r}); import suite; suite.start_upstream({delay}); "
+         "import waitress; from src.flask import app; waitress.serve(app, host='127.0.0.1', port={port})")
+
+def import_time(workdir: str) -> float:
+    out = subprocess.run([sys.executable, "-c", IMPORT], cwd=workdir, env=dict(os.environ, PYTHONPATH=ROOT),
+                         capture_output=True, text=True, check=True)
+    return float(out.stdout.strip().splitlines()[-1])
+
+def time_to_first_byte(workdir: str, fast_start: bool, delay: float, timeout: float = 120):
+    """Seconds from spawn until GET /all answers, and the status it answered with."""
+    port = free_port()
+    env = dict(os.environ, PYTHONPATH=ROOT, DEBUG="false", FAST_START=str(fast_start))
+    started = time.perf_counter()
+    serve = SERVE.format(bench=BENCH, port=port, delay=delay)
+    proc = subprocess.Popen([sys.executable, "-c", serve], cwd=workdir, env=env,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        while time.perf_counter() - started < timeout:
+            try:
+                conn = http.client.HTTPConnection("127.0.0.1", port, timeout=timeout)
+                conn.request("GET", "/all")
+                resp = conn.getresponse()
+                resp.read()
+                return time.perf_counter() - started, resp.status
+            except OSError:
+                time.sleep(0.005)
+        raise RuntimeError("server did not answer")
+    finally:
+        proc.terminate()
+        proc.wait()
+
+def make_stale(workdir: str, age: float = 2 * 86400) -> None:
+    then = time.time() - age
+    storage = os.path.join(workdir, "storage")
+    for name in os.listdir(storage):
+        os.utime(os.path.join(storage, name), (then, then))
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--runs", type=int, default=5)
+    ap.add_argument("--upstream-delay", type=float, default=0.5)
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        build_storage(workdir)
+        imports = [import_time(workdir) for _ in range(args.runs)]
+        print(f"import src.flask: median {statistics.median(imports) * 1000:.1f} ms, min {min(imports) * 1000:.1f} ms")
+        for fast_start in (False, True):
+            results = []
+            for _ in range(args.runs):
+                make_stale(workdir)
+                results.append(time_to_first_byte(workdir, fast_start, args.upstream_delay))
+            ttfb = [t for t, _ in results]
+            print(f"FAST_START={str(fast_start).lower():5} time to first /all byte: "
+                  f"median {statistics.median(ttfb) * 1000:.0f} ms, min {min(ttfb) * 1000:.0f} ms, "
+                  f"statuses {sorted({s for _, s in results})}")
+
+if __name__ == "__main__":
+    main()
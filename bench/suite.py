@@ -0,0 +1,252 @@
+"""
+Offline benchmark suite: scrapers, merges, get_all and /all throughput.
+
+The upstream pages are replayed from bench/fixtures/ through a local stand-in
+HTTP server, so the whole pipeline runs without network access. The checked-in
+fixtures follow the structure of the live pages (value cards, the embedded
+stock state, the values API) with the info catalog's items; --record replaces
+them with real captures.
+
+    python bench/suite.py                  # run and compare with bench/baseline.json
+    python bench/suite.py --save-baseline  # store this run as the baseline
+    python bench/suite.py --record         # refresh bench/fixtures/ from the live sites
+
+Exits with status 1 when a case is slower (or /all serves fewer requests per
+second) than the baseline by more than --tolerance.
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from throughput import ROOT, SERVERS, free_port, wait_ready, hammer
+
+FIXTURES = os.path.join(ROOT, "bench", "fixtures")
+BASELINE = os.path.join(ROOT, "bench", "baseline.json")
+
+# stand-in path -> (fixture file, content type)
+ROUTES = {
+    "/blox-fruits-value-list/": ("fruityblox_values.html", "text/html; charset=utf-8"),
+    "/stock/": ("fruityblox_stock.html", "text/html; charset=utf-8"),
+    "/api/v1/values": ("bloxfruitsvalues.json", "application/json"),
+}
+# stand-in path prefix -> (fixture file, content type)
+PREFIX_ROUTES = {
+    "/images/": ("image.png", "image/png"),
+}
+
+def _fixture(name: str) -> bytes:
+    with open(os.path.join(FIXTURES, name), "rb") as f:
+        return f.read()
+
+# -----------------------------------------------------------------------------
+# Stand-in upstream
+# -----------------------------------------------------------------------------
+
+class _Upstream(BaseHTTPRequestHandler):
+    bodies = {}
+    prefix_bodies = {}
+    delay = 0.0   # simulated upstream latency per request
+
+    def do_GET(self):
+        time.sleep(self.delay)
+        path = self.path.split("?")[0]
+        hit = self.bodies.get(path)
+        for prefix, (body, content_type) in self.prefix_bodies.items():
+            if hit is None and path.startswith(prefix):
+                hit = body, content_type
+        if hit is None:
+            # REFRESH_BASE pings from get_all() land here
+            self.send_response(404)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        body, content_type = hit
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+def start_upstream(delay: float = 0.0) -> str:
+    """Serve the fixtures on a free local port and point the scrapers at it. Returns the base URL."""
+    _Upstream.bodies = {path: (_fixture(name), ctype) for path, (name, ctype) in ROUTES.items()}
+    _Upstream.prefix_bodies = {prefix: (_fixture(name), ctype) for prefix, (name, ctype) in PREFIX_ROUTES.items()}
+    _Upstream.delay = delay
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Upstream)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+
+    from src import fruits_scraper_fruity, fruits_scraper_bfv, stock_scraper, images
+    from src import all as all_module
+    fruits_scraper_fruity.URL_VALUES = base + "/blox-fruits-value-list/"
+    stock_scraper.URL_STOCK = base + "/stock/"
+    fruits_scraper_bfv.URL = base + "/api/v1/values"
+    all_module.REFRESH_BASE = base
+    images.SOURCE_BASE = base + "/"
+    return base
+
+def record() -> None:
+    """Overwrite the fixtures with fresh copies of the live pages."""
+    import requests
+    from src import fruits_scraper_fruity, fruits_scraper_bfv, stock_scraper
+    sources = {
+        "fruityblox_values.html": lambda: requests.get(fruits_scraper_fruity.URL_VALUES, timeout=20),
+        "fruityblox_stock.html": lambda: requests.get(stock_scraper.URL_STOCK, timeout=20),
+        "bloxfruitsvalues.json": lambda: fruits_scraper_bfv.make_session().get(
+            fruits_scraper_bfv.URL, headers=fruits_scraper_bfv.HEADERS, timeout=20),
+    }
+    for name, fetch in sources.items():
+        resp = fetch()
+        resp.raise_for_status()
+        with open(os.path.join(FIXTURES, name), "wb") as f:
+            f.write(resp.content)
+        print(f"recorded {name} ({len(resp.content)} bytes)")
+
+# -----------------------------------------------------------------------------
+# Cases
+# -----------------------------------------------------------------------------
+
+def measure(fn, min_time: float, min_runs: int = 5) -> dict:
+    """Median/min wall time of fn() in ms, after one warm-up call. Scraper/merge output is silenced."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        fn()
+        times = []
+        deadline = time.perf_counter() + min_time
+        while len(times) < min_runs or time.perf_counter() < deadline:
+            t = time.perf_counter()
+            fn()
+            times.append(time.perf_counter() - t)
+    return {"median_ms": round(statistics.median(times) * 1000, 3), "min_ms": round(min(times) * 1000, 3), "runs": len(times)}
+
+def cases(workdir: str):
+    """(name, callable) pairs. Merge inputs are the cache files get_all() writes from the fixtures."""
+    from src.fruits_scraper_fruity import get_fruits as fruity_get_fruits
+    from src.fruits_scraper_bfv import get_fruits as bfv_get_fruits
+    from src.stock_scraper import parse_stock_from_soup, get_stock_all
+    from src.all import get_all, merge_fruits_with_averages, merge_gamepasses_with_averages
+    from src.catalog import catalog
+    from src import images
+
+    # background image downloads would outlive the workdir and skew the timings
+    images.ENABLED = False
+    with contextlib.redirect_stdout(io.StringIO()):
+        get_all()
+
+    def load(name):
+        with open(os.path.join(workdir, "storage", name), encoding="utf-8") as f:
+            return json.load(f)
+
+    fruity_fruits, bfv_fruits = load("data_fruity_fruits.json"), load("data_bfv_fruits.json")
+    bfv_skins, info = load("data_bfv_skins.json"), catalog()
+    gamepasses = load("data_fruity_gamepasses.json") + load("data_bfv_gamepasses.json")
+    stock_html = _fixture("fruityblox_stock.html").decode("utf-8")
+
+    return [
+        ("fruity.get_fruits", fruity_get_fruits),
+        ("bfv.get_fruits", bfv_get_fruits),
+        ("parse_stock_from_soup", lambda: parse_stock_from_soup(stock_html)),
+        ("stock.get_stock_all", get_stock_all),
+        ("merge_fruits_with_averages", lambda: merge_fruits_with_averages(bfv_fruits, fruity_fruits, info, bfv_skins)),
+        ("merge_gamepasses_with_averages", lambda: merge_gamepasses_with_averages(gamepasses)),
+        ("get_all", get_all),
+    ]
+
+def route_throughput(workdir: str, server: str, seconds: float, clients: int) -> dict:
+    """Requests per second for /all served from the storage/ that get_all() just built."""
+    port = free_port()
+    env = dict(os.environ, PYTHONPATH=ROOT, DEBUG="false")
+    proc = subprocess.Popen(SERVERS[server](port), cwd=workdir, env=env,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        wait_ready(port)
+        hammer(port, "/all", 0.5, 2)  # warm up
+        return hammer(port, "/all", seconds, clients)
+    finally:
+        proc.terminate()
+        proc.wait()
+
+# -----------------------------------------------------------------------------
+# Baseline comparison
+# -----------------------------------------------------------------------------
+
+MIN_DELTA_MS = 0.1   # sub-0.1ms differences are timer noise, not regressions
+
+def regressions(results: dict, baseline: dict, tolerance: float):
+    """Yield (case, metric, baseline value, current value) for every metric worse than the tolerance."""
+    for case, now in results.items():
+        before = baseline.get(case)
+        if not before:
+            continue
+        if ("median_ms" in now and before.get("median_ms")
+                and now["median_ms"] > before["median_ms"] * (1 + tolerance)
+                and now["median_ms"] - before["median_ms"] > MIN_DELTA_MS):
+            yield case, "median_ms", before["median_ms"], now["median_ms"]
+        if "rps" in now and before.get("rps") and now["rps"] < before["rps"] * (1 - tolerance):
+            yield case, "rps", before["rps"], now["rps"]
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--min-time", type=float, default=1.0, help="seconds spent on each case")
+    ap.add_argument("--seconds", type=float, default=5, help="duration of the /all load test")
+    ap.add_argument("--clients", type=int, default=16)
+    ap.add_argument("--server", choices=list(SERVERS), default="waitress")
+    ap.add_argument("--only", nargs="+", help="run only these cases")
+    ap.add_argument("--tolerance", type=float, default=0.15)
+    ap.add_argument("--baseline", default=BASELINE)
+    ap.add_argument("--save-baseline", action="store_true")
+    ap.add_argument("--record", action="store_true")
+    args = ap.parse_args()
+
+    if args.record:
+        record()
+        return
+
+    results = {}
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as workdir:
+        os.chdir(workdir)
+        try:
+            start_upstream()
+            for name, fn in cases(workdir):
+                if args.only and name not in args.only:
+                    continue
+                results[name] = measure(fn, args.min_time)
+                print(f"{name:32} {results[name]}", flush=True)
+            route = f"GET /all ({args.server})"
+            if not args.only or route in args.only:
+                results[route] = route_throughput(workdir, args.server, args.seconds, args.clients)
+                print(f"{route:32} {results[route]}", flush=True)
+        finally:
+            os.chdir(cwd)
+
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"baseline saved to {args.baseline}")
+        return
+    if not os.path.exists(args.baseline):
+        print(f"no baseline at {args.baseline}; run with --save-baseline first")
+        return
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = json.load(f)
+    found = list(regressions(results, baseline, args.tolerance))
+    for case, metric, before, now in found:
+        print(f"REGRESSION {case}: {metric} {before} -> {now}")
+    if found:
+        sys.exit(1)
+    print(f"no regressions beyond {args.tolerance:.0%}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""
+Route throughput: waitress (src.flask:app) vs uvicorn (src.asgi:app).
+
+Both servers run against the same pre-built storage/ in a temporary directory,
+so no upstream scraping happens during the measurement.
+
+    python bench/throughput.py [--seconds 5] [--clients 16] [--paths /all /fruits/leopard]
+"""
+import argparse
+import http.client
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import json
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+SERVERS = {
+    "waitress": lambda port: ["waitress-serve", f"--listen=127.0.0.1:{port}", "src.flask:app"],
+    "uvicorn": lambda port: ["uvicorn", "--host=127.0.0.1", f"--port={port}", "--log-level=warning", "src.asgi:app"],
+}
+
+def build_storage(workdir: str) -> None:
+    """Write a storage/all.json (plus stock.json and fruits.json) merged from the static catalog (no network)."""
+    cwd = os.getcwd()
+    os.makedirs(os.path.join(workdir, "storage"), exist_ok=True)
+    os.chdir(workdir)
+    try:
+        from src.catalog import catalog
+        from src.all import merge_fruits_with_averages
+        info = catalog()
+        fruits = merge_fruits_with_averages(json.loads(info.body), [], info, [])
+        doc = {
+            "stock": {"normal": [f["name"] for f in fruits[:4]], "mirage": [f["name"] for f in fruits[4:9]]},
+            "fruits": fruits,
+            "gamepasses": [{"name": "2x Mastery", "regTrend": "", "regValue": 0, "tradeable": True, "robuxPrice": 450}],
+            "specials": [],
+        }
+        for name in ("all.json", "stock.json", "fruits.json"):
+            with open(os.path.join("storage", name), "w", encoding="utf-8") as f:
+                json.dump(doc if name == "all.json" else doc["stock"] if name == "stock.json" else {"fruits": [], "gamepasses": []}, f, indent=2)
+    finally:
+        os.chdir(cwd)
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def wait_ready(port: int, timeout: float = 20) -> None:
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.5).close()
+            return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError("server did not start")
+
+def hammer(port: int, path: str, seconds: float, clients: int):
+    latencies, errors = [], [0]
+    lock = threading.Lock()
+    stop = time.perf_counter() + seconds
+
+    def client():
+        conn = http.client.HTTPConnection("127.0.0.1", port, timeout=10)
+        local = []
+        while time.perf_counter() < stop:
+            t = time.perf_counter()
+            try:
+                conn.request("GET", path)
+                resp = conn.getresponse()
+                resp.read()
+                if resp.status != 200:
+                    errors[0] += 1
+            except (OSError, http.client.HTTPException):
+                errors[0] += 1
+                conn.close()
+                conn = http.client.HTTPConnection("127.0.0.1", port, timeout=10)
+                continue
+            local.append(time.perf_counter() - t)
+        with lock:
+            latencies.extend(local)
+
+    threads = [threading.Thread(target=client) for _ in range(clients)]
+    for t in threads: t.start()
+    for t in threads: t.join()
+    latencies.sort()
+    n = len(latencies)
+    return {
+        "rps": round(n / seconds, 1),
+        "p50_ms": round(statistics.median(latencies) * 1000, 2) if n else None,
+        "p99_ms": round(latencies[int(n * 0.99) - 1] * 1000, 2) if n else None,
+        "errors": errors[0],
+    }
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--seconds", type=float, default=5)
+    ap.add_argument("--clients", type=int, default=16)
+    ap.add_argument("--servers", nargs="+", default=list(SERVERS))
+    ap.add_argument("--paths", nargs="+", default=["/all", "/fruits/leopard", "/stock"])
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        build_storage(workdir)
+        env = dict(os.environ, PYTHONPATH=ROOT, DEBUG="false")
+        for server in args.servers:
+            port = free_port()
+            proc = subprocess.Popen(SERVERS[server](port), cwd=workdir, env=env,
+                                    stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            try:
+                wait_ready(port)
+                for path in args.paths:
+                    hammer(port, path, 0.5, 2)  # warm up
+                    print(server, path, hammer(port, path, args.seconds, args.clients), flush=True)
+            finally:
+                proc.terminate()
+                proc.wait()
+
+if __name__ == "__main__":
+    main()
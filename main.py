@@ -1,13 +1,35 @@
 import os
+import sys
 import dotenv, subprocess
 
 dotenv.load_dotenv()
 debug = os.getenv("DEBUG", "False").lower() in ("true", "1", "t")
+server = os.getenv("SERVER", "waitress").lower()   # "waitress" | "asgi"
+workers = int(os.getenv("WORKERS", "1"))
+threads = os.getenv("WAITRESS_THREADS", "16")   # stock streams and long-polls each hold one
+
+def run_shared(workers: int) -> None:
+    """One refresher process + `workers` server processes reading its shared snapshots."""
+    env = dict(os.environ, SNAPSHOT_MODE="shared")
+    procs = [subprocess.Popen([sys.executable, "-m", "src.workers", "refresher"], env=env)]
+    if server == "asgi":
+        procs.append(subprocess.Popen(["uvicorn", "--host=0.0.0.0", "--port=5000", f"--workers={workers}", "src.asgi:app"], env=env))
+    else:
+        procs += [subprocess.Popen([sys.executable, "-m", "src.workers", "worker", "5000"], env=env) for _ in range(workers)]
+    try:
+        for p in procs:
+            p.wait()
+    finally:
+        for p in procs:
+            p.terminate()
 
 if __name__ == "__main__":
-    if debug:
+    if workers > 1 and not debug:
+        run_shared(workers)
+    elif debug and server != "asgi":
         from src.flask import app
         app.run(host="0.0.0.0", port=5000, debug=True)
+    elif server == "asgi":
+        subprocess.call(["uvicorn", "--host=0.0.0.0", "--port=5000", "src.asgi:app"])
     else:
-        subprocess.call(["waitress-serve", f"--listen=0.0.0.0:5000", "src.flask:app"])
-  
\ No newline at end of file
+        subprocess.call(["waitress-serve", f"--listen=0.0.0.0:5000", f"--threads={threads}", "src.flask:app"])
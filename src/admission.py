@@ -0,0 +1,86 @@
+import os
+import threading
+from typing import Callable, Dict, Set
+
+from . import metrics
+
+# -----------------------------------------------------------------------------
+# Admission control for refreshes that run on request threads
+# -----------------------------------------------------------------------------
+#
+# A stale storage file makes the request that finds it do the scraping. Without a
+# bound, a burst of requests right at expiry pins every server thread on upstream
+# I/O. Here at most MAX_REFRESHES refreshes run at once (one per file); everybody
+# else serves the file already on disk, flagged stale. Only a request with nothing
+# on disk waits, for up to QUEUE_TIMEOUT, and then gets a 503 with Retry-After.
+
+MAX_REFRESHES = max(1, int(os.environ.get("ADMISSION_MAX_REFRESHES", "2")))
+QUEUE_TIMEOUT = float(os.environ.get("ADMISSION_QUEUE_TIMEOUT", "10"))   # seconds a request without data waits
+RETRY_AFTER = int(os.environ.get("ADMISSION_RETRY_AFTER", "5"))          # Retry-After of the 503
+
+ADMISSIONS = metrics.Counter("admission_requests_total",
+                             "Refresh attempts by route and outcome (admitted/stale/waited/rejected).",
+                             ("route", "result"))
+
+class Overloaded(Exception):
+    """Nothing to serve and no refresh slot freed up in time."""
+
+    def __init__(self, message: str, retry_after: int = RETRY_AFTER):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+class Admission:
+    def __init__(self, limit: int = MAX_REFRESHES, timeout: float = QUEUE_TIMEOUT):
+        self.limit, self.timeout = limit, timeout
+        self._cond = threading.Condition()
+        self._running: Set[str] = set()     # files being refreshed
+        self._queued: Dict[str, int] = {}   # route -> requests waiting for a slot
+
+    def _free(self, path: str) -> bool:
+        return path not in self._running and len(self._running) < self.limit
+
+    def refresh(self, route: str, path: str, refresh: Callable[[], object], has_data: Callable[[], bool]) -> bool:
+        """
+        Run `refresh` for `path` if a slot is free. False when it is not and there is
+        data to serve as is (stale); True once `refresh` ran or a wait ended with another
+        request's refresh, so the caller checks the file again. Raises Overloaded when
+        there is nothing to serve and no slot freed up within the timeout.
+        """
+        with self._cond:
+            if not self._free(path):
+                if has_data():
+                    ADMISSIONS.inc(route, "stale")
+                    return False
+                self._queued[route] = self._queued.get(route, 0) + 1
+                try:
+                    if not self._cond.wait_for(lambda: self._free(path), self.timeout):
+                        ADMISSIONS.inc(route, "rejected")
+                        raise Overloaded("The data is being refreshed; try again shortly.")
+                finally:
+                    self._queued[route] -= 1
+                if has_data():   # the refresh we waited on wrote it
+                    ADMISSIONS.inc(route, "waited")
+                    return True
+            ADMISSIONS.inc(route, "admitted")
+            self._running.add(path)
+        try:
+            refresh()
+        finally:
+            with self._cond:
+                self._running.discard(path)
+                self._cond.notify_all()
+        return True
+
+    def queued(self) -> Dict[tuple, int]:
+        with self._cond:
+            return {(route,): n for route, n in self._queued.items()}
+
+    def running(self) -> int:
+        with self._cond:
+            return len(self._running)
+
+admission = Admission()
+
+metrics.Gauge("admission_queue_depth", "Requests waiting for a refresh slot, by route.",
+              admission.queued, labels=("route",))
+metrics.Gauge("admission_refreshes_running", "Refreshes running on request threads.", admission.running)
@@ -1,15 +1,24 @@
 import os
-import json
 import re
 from collections import OrderedDict, Counter
+from collections.abc import Mapping
 from statistics import mean
 
 import requests
 
 # Local imports
-from .stock_scraper import get_stock_all
+from .stock_scraper import refresh_stock
 from .fruits_scraper_fruity import get_fruits as get_fruits_fruity
 from .fruits_scraper_bfv import get_fruits as get_fruits_bfv
+from .names import normalize_name, words, normalize_name_words, FRUIT_ALIASES
+from .snapshot import current_snapshot
+from .metrics import span
+from .profiling import profiled
+from .catalog import Catalog, build_indexes, catalog, thaw
+from .breaker import Source
+from .images import image_cache
+from .serializer import dumps, loads, PRETTY
+from . import recording
 
 # -----------------------------------------------------------------------------
 # Configuration & small helpers
@@ -23,6 +32,7 @@ result = {
     "fruits": "",
     "gamepasses": "",
     "specials": "",
+    "sources": "",
 }
 
 def _get_nested(vals, idx, key, default=None):
@@ -32,22 +42,6 @@ def _get_nested(vals, idx, key, default=None):
     except Exception:
         return default
 
-def _load_json_safe(path, default):
-    try:
-        with open(path, "r", encoding="utf-8") as f:
-            return json.load(f)
-    except Exception:
-        return default
-
-def normalize_name(name: str) -> str:
-    return re.sub(r'[^a-z]+', '', (name or '').lower())
-
-def words(name: str):
-    return re.findall(r'[a-z]+', (name or '').lower())
-
-def normalize_name_words(name: str) -> str:
-    return ''.join(sorted(words(name)))
-
 def choose_better_name(a: str, b: str) -> str:
     if len(b) > len(a):
         return b
@@ -81,27 +75,41 @@ def to_int_loose(x):
 
 # -----------------------------------------------------------------------------
 # Safe fetchers (avoid module-level scraping on cold start)
+#
+# Each upstream sits behind a circuit breaker (breaker.py). When it fails, the
+# merge gets that source's last-known-good normalized data, and /all marks the
+# source as stale under "sources".
 # -----------------------------------------------------------------------------
 
+def _fetch_fruity():
+    d = get_fruits_fruity() or {}
+    fruits = d.get("fruits") or []
+    if not fruits:
+        raise ValueError("no fruits parsed from the value list")
+    # In original code the last item was popped (likely a summary row)
+    return {"fruits": fruits[:-1], "gamepasses": d.get("gamepasses") or []}
+
+def _fetch_bfv():
+    d = get_fruits_bfv() or {}
+    if not d.get("fruits"):
+        raise ValueError("no fruits in the values API response")
+    return {"fruits": d["fruits"], "gamepasses": d.get("gamepasses") or [], "extra": d.get("extra") or []}
+
+SOURCES = {
+    "fruity": Source("fruity", _fetch_fruity),
+    "bfv": Source("bfv", _fetch_bfv),
+    "stock": Source("stock", refresh_stock),   # writes stock.json and stock_full.json together
+}
+
 def _safe_fruity():
-    """Return (fruits, gamepasses) from fruity scraper, or empty on failure."""
-    try:
-        d = get_fruits_fruity() or {}
-        fruits = d.get("fruits") or []
-        # In original code the last item was popped (likely a summary row)
-        if fruits:
-            fruits = fruits[:-1]  # drop last element defensively
-        return fruits, (d.get("gamepasses") or [])
-    except Exception:
-        return [], []
+    """Return (fruits, gamepasses, status) from fruity scraper, falling back to the last good data."""
+    d, status = SOURCES["fruity"].get(empty={})
+    return (d.get("fruits") or []), (d.get("gamepasses") or []), status
 
 def _safe_bfv():
-    """Return (fruits, gamepasses, extra) from bfv scraper, or empty on failure."""
-    try:
-        d = get_fruits_bfv() or {}
-        return (d.get("fruits") or []), (d.get("gamepasses") or []), (d.get("extra") or [])
-    except Exception:
-        return [], [], []
+    """Return (fruits, gamepasses, extra, status) from bfv scraper, falling back to the last good data."""
+    d, status = SOURCES["bfv"].get(empty={})
+    return (d.get("fruits") or []), (d.get("gamepasses") or []), (d.get("extra") or []), status
 
 # -----------------------------------------------------------------------------
 # Gamepasses merge
@@ -160,11 +168,8 @@ def merge_gamepasses_with_averages(gamepasses):
 # -----------------------------------------------------------------------------
 
 def merge_fruits_with_averages(fruits_bfv, fruits_fruity, fruits_info, bfv_skins):
-    # simple alias map (extend as needed)
-    alias = {
-        normalize_name_words("Lightning"): normalize_name_words("Rumble"),
-        # normalize_name_words("Door"): normalize_name_words("Portal"),
-    }
+    # simple alias map (shared with the lookup endpoints, see names.py)
+    alias = FRUIT_ALIASES
 
     # Build master fruit name list for resolver
     fruit_names = []
@@ -176,13 +181,11 @@ def merge_fruits_with_averages(fruits_bfv, fruits_fruity, fruits_info, bfv_skins
     fruit_names = sorted(set(fruit_names), key=lambda n: -len(n))
     fruit_key_map = {normalize_name_words(n): alias.get(normalize_name_words(n), normalize_name_words(n)) for n in fruit_names}
 
-    # Index info by canonical key
-    info_index = {}
-    for it in fruits_info:
-        n = it.get("name")
-        if not n: continue
-        k = alias.get(normalize_name_words(n), normalize_name_words(n))
-        info_index[k] = it
+    # Index info by canonical key (prebuilt once for the shipped catalog)
+    if isinstance(fruits_info, Catalog):
+        info_index, info_skin_to_fruit = fruits_info.by_fruit, fruits_info.skin_to_fruit
+    else:
+        info_index, info_skin_to_fruit = build_indexes(fruits_info)
 
     merged = OrderedDict()
 
@@ -195,7 +198,7 @@ def merge_fruits_with_averages(fruits_bfv, fruits_fruity, fruits_info, bfv_skins
                 "_rarity_first": None, "_regTrend_first": None, "_beliPrice_first": None,
                 "_fruitType_first": None, "_permTrend_first": None,
                 "_awakening_first": None, "_awakening_total_fallback": 0,
-                "_upgrading": [],
+                "_upgrading": [], "_image": None,
                 "_skins_map": {},          # skey -> per-skin aggregator
                 "_bfv_skin_keys": set(),   # for mismatch report
                 "_info_skin_keys": set(),
@@ -252,15 +255,6 @@ def merge_fruits_with_averages(fruits_bfv, fruits_fruity, fruits_info, bfv_skins
 
         return None, None
 
-    # quick reverse map: skin name (info) -> fruit fkey
-    info_skin_to_fruit = {}
-    for f_it in fruits_info:
-        fkey = alias.get(normalize_name_words(f_it.get("name", "")), normalize_name_words(f_it.get("name", "")))
-        for s in (f_it.get("skins") or []):
-            sname = s.get("name")
-            if not sname: continue
-            info_skin_to_fruit[normalize_name_words(sname)] = fkey
-
     # Track which BFV skin names we actually resolved (either directly or via info fallback)
     resolved_bfv_skin_names = set()
 
@@ -392,12 +386,15 @@ def merge_fruits_with_averages(fruits_bfv, fruits_fruity, fruits_info, bfv_skins
         if (v := inf.get("robux_price")) is not None: b["_robuxPrices"].append(to_int_loose(v))
         if b["_beliPrice_first"] is None and (v := inf.get("price")) is not None: b["_beliPrice_first"] = to_int_loose(v)
         if b["_rarity_first"] is None and inf.get("rarity"): b["_rarity_first"] = inf["rarity"]
-        b["_upgrading"] = inf.get("upgrading", []) or []
+        b["_upgrading"] = thaw(inf.get("upgrading") or [])
         if (v := inf.get("awakening")) and to_int_loose(v) > 0: b["_awakening_total_fallback"] = to_int_loose(v)
+        if b["_awakening_first"] is None and isinstance(ap := inf.get("awakeningPrice"), Mapping):
+            b["_awakening_first"] = {k: to_int_loose(ap.get(k)) for k in ("z","x","c","v","f")}
+        if b["_image"] is None and inf.get("image"): b["_image"] = inf["image"]
 
         info_skins = inf.get("skins") or []
         for s in info_skins:
-            if not isinstance(s, dict): continue
+            if not isinstance(s, Mapping): continue
             sname = s.get("name")
             if not sname: continue
             skey = normalize_name_words(sname)
@@ -575,7 +572,7 @@ def merge_fruits_with_averages(fruits_bfv, fruits_fruity, fruits_info, bfv_skins
             "permTrend": b["_permTrend_first"] or "",
             "tradeable": any(b["_tradeables"]),
             "robuxPrice": fruit_robux,
-            "image": "",
+            "image": b["_image"] or "",
             "awakening": awakening,
             "upgrading": b["_upgrading"],
             "skins": skins,
@@ -600,7 +597,7 @@ def ready_cache(data_fruity_fruits, data_fruity_gamepasses, data_bfv_fruits, dat
     os.makedirs(STORAGE_DIR, exist_ok=True)
 
     # ---- Fruity fruits: tolerate missing 'values' ----
-    with open(os.path.join(STORAGE_DIR, "data_fruity_fruits.json"), "w", encoding="utf-8") as f:
+    with open(os.path.join(STORAGE_DIR, "data_fruity_fruits.json"), "wb") as f:
         for fruit in (data_fruity_fruits or []):
             vals = fruit.get("values") or []
             # keep existing numeric fields if already present; otherwise derive from values[]
@@ -611,26 +608,26 @@ def ready_cache(data_fruity_fruits, data_fruity_gamepasses, data_bfv_fruits, dat
             # remove only if present
             if "values" in fruit:
                 fruit.pop("values", None)
-        json.dump(data_fruity_fruits, f, indent=2, ensure_ascii=False)
+        f.write(dumps(data_fruity_fruits, pretty=PRETTY))
 
     # ---- Fruity gamepasses ----
-    with open(os.path.join(STORAGE_DIR, "data_fruity_gamepasses.json"), "w", encoding="utf-8") as f:
+    with open(os.path.join(STORAGE_DIR, "data_fruity_gamepasses.json"), "wb") as f:
         for gamepass in (data_fruity_gamepasses or []):
             vals = gamepass.get("values") or []
             gamepass["regValueNumeric"] = gamepass.get("regValueNumeric", _get_nested(vals, 0, "numeric", 0))
             gamepass["regValueRaw"]     = gamepass.get("regValueRaw",     _get_nested(vals, 0, "raw", ""))
             if "values" in gamepass:
                 gamepass.pop("values", None)
-        json.dump(data_fruity_gamepasses, f, indent=2, ensure_ascii=False)
+        f.write(dumps(data_fruity_gamepasses, pretty=PRETTY))
 
     # ---- BFV fruits: pop keys safely ----
-    with open(os.path.join(STORAGE_DIR, "data_bfv_fruits.json"), "w", encoding="utf-8") as f:
+    with open(os.path.join(STORAGE_DIR, "data_bfv_fruits.json"), "wb") as f:
         for fruit in (data_bfv_fruits or []):
             fruit.pop("category", None)
-        json.dump(data_bfv_fruits, f, indent=2, ensure_ascii=False)
+        f.write(dumps(data_bfv_fruits, pretty=PRETTY))
 
     # ---- BFV gamepasses: pop keys safely ----
-    with open(os.path.join(STORAGE_DIR, "data_bfv_gamepasses.json"), "w", encoding="utf-8") as f:
+    with open(os.path.join(STORAGE_DIR, "data_bfv_gamepasses.json"), "wb") as f:
         for gamepass in (data_bfv_gamepasses or []):
             gamepass.pop("category", None)
             gamepass.pop("rarity", None)
@@ -638,10 +635,10 @@ def ready_cache(data_fruity_fruits, data_fruity_gamepasses, data_bfv_fruits, dat
             gamepass.pop("fruitType", None)
             gamepass.pop("permTrend", None)
             gamepass.pop("permValue", None)
-        json.dump(data_bfv_gamepasses, f, indent=2, ensure_ascii=False)
+        f.write(dumps(data_bfv_gamepasses, pretty=PRETTY))
 
     # ---- BFV skins: pop keys safely ----
-    with open(os.path.join(STORAGE_DIR, "data_bfv_skins.json"), "w", encoding="utf-8") as f:
+    with open(os.path.join(STORAGE_DIR, "data_bfv_skins.json"), "wb") as f:
         for skin in (data_bfv_skins or []):
             skin.pop("category", None)
             skin.pop("rarity", None)
@@ -649,10 +646,10 @@ def ready_cache(data_fruity_fruits, data_fruity_gamepasses, data_bfv_fruits, dat
             skin.pop("fruitType", None)
             skin.pop("permTrend", None)
             skin.pop("permValue", None)
-        json.dump(data_bfv_skins, f, indent=2, ensure_ascii=False)
+        f.write(dumps(data_bfv_skins, pretty=PRETTY))
 
     # ---- BFV specials: pop keys safely ----
-    with open(os.path.join(STORAGE_DIR, "data_bfv_specials.json"), "w", encoding="utf-8") as f:
+    with open(os.path.join(STORAGE_DIR, "data_bfv_specials.json"), "wb") as f:
         for special in (data_bfv_specials or []):
             special.pop("category", None)
             special.pop("rarity", None)
@@ -661,59 +658,72 @@ def ready_cache(data_fruity_fruits, data_fruity_gamepasses, data_bfv_fruits, dat
             special.pop("permTrend", None)
             special.pop("permValue", None)
             special.pop("robuxPrice", None)
-        json.dump(data_bfv_specials, f, indent=2, ensure_ascii=False)
+        f.write(dumps(data_bfv_specials, pretty=PRETTY))
 
 # -----------------------------------------------------------------------------
 # Main entry
 # -----------------------------------------------------------------------------
 
+@profiled("get_all")
 def get_all():
-    # Best-effort refresh of dependent endpoints (works locally; configurable in prod)
-    for path in ("fruits", "stock", "info"):
-        try:
-            requests.get(f"{REFRESH_BASE}/{path}", timeout=5)
-        except Exception:
-            pass
+    # Best-effort refresh of dependent endpoints (works locally; configurable in prod).
+    # Not recordable, so skipped unless the deployment source is live (src/recording.py)
+    if recording.mode_for("deployment") == recording.LIVE:
+        for path in ("fruits", "stock", "info"):
+            try:
+                requests.get(f"{REFRESH_BASE}/{path}", timeout=5)
+            except Exception:
+                pass
 
     # Pull fresh data each call (avoid poisoning global state on cold start)
-    fruity_fruits, fruity_gamepasses = _safe_fruity()
-    bfv_fruits, bfv_gamepasses, bfv_extra = _safe_bfv()
+    fruity_fruits, fruity_gamepasses, fruity_status = _safe_fruity()
+    bfv_fruits, bfv_gamepasses, bfv_extra, bfv_status = _safe_bfv()
 
     # Split BFV "extra" into skins & specials robustly
     data_bfv_skins = [s for s in (bfv_extra or []) if "Dragon Token" not in (s.get("name") or "")]
     data_bfv_specials = [s for s in (bfv_extra or []) if "Dragon Token" in (s.get("name") or "")]
 
     # Prepare cache files
-    ready_cache(
-        data_fruity_fruits=fruity_fruits,
-        data_fruity_gamepasses=fruity_gamepasses,
-        data_bfv_fruits=bfv_fruits,
-        data_bfv_gamepasses=bfv_gamepasses,
-        data_bfv_skins=data_bfv_skins,
-        data_bfv_specials=data_bfv_specials,
-    )
-
-    # Load back the normalized cache + info.json
-    with open(os.path.join(STORAGE_DIR, "all.json"), "w", encoding="utf-8") as f_all, \
-         open(os.path.join(STORAGE_DIR, "data_fruity_gamepasses.json"), "r", encoding="utf-8") as f_fruity_gp, \
-         open(os.path.join(STORAGE_DIR, "data_bfv_gamepasses.json"), "r", encoding="utf-8") as f_bfv_gp, \
-         open(os.path.join(STORAGE_DIR, "data_fruity_fruits.json"), "r", encoding="utf-8") as f_fruity_fr, \
-         open(os.path.join(STORAGE_DIR, "data_bfv_fruits.json"), "r", encoding="utf-8") as f_bfv_fr, \
-         open(os.path.join(STORAGE_DIR, "data_bfv_skins.json"), "r", encoding="utf-8") as f_bfv_skins:
-
-        gamepasses_from_fruity = json.load(f_fruity_gp)
-        gamepasses_from_bfv    = json.load(f_bfv_gp)
-        fruits_from_fruity     = json.load(f_fruity_fr)
-        fruits_from_bfv        = json.load(f_bfv_fr)
-        bfv_skins              = json.load(f_bfv_skins)
-
-        # info.json may not exist on a pristine deploy; tolerate missing
-        info_fruits = _load_json_safe(os.path.join(STORAGE_DIR, "info.json"), default=[])
-
-        result["stock"]      = get_stock_all()
-        result["specials"]   = data_bfv_specials
-        result["gamepasses"] = merge_gamepasses_with_averages(gamepasses_from_fruity + gamepasses_from_bfv)
-        result["fruits"]     = merge_fruits_with_averages(fruits_from_bfv, fruits_from_fruity, info_fruits, bfv_skins)
+    with span("normalize", "all"):
+        ready_cache(
+            data_fruity_fruits=fruity_fruits,
+            data_fruity_gamepasses=fruity_gamepasses,
+            data_bfv_fruits=bfv_fruits,
+            data_bfv_gamepasses=bfv_gamepasses,
+            data_bfv_skins=data_bfv_skins,
+            data_bfv_specials=data_bfv_specials,
+        )
+
+    # Load back the normalized cache
+    with open(os.path.join(STORAGE_DIR, "all.json"), "wb") as f_all, \
+         open(os.path.join(STORAGE_DIR, "data_fruity_gamepasses.json"), "rb") as f_fruity_gp, \
+         open(os.path.join(STORAGE_DIR, "data_bfv_gamepasses.json"), "rb") as f_bfv_gp, \
+         open(os.path.join(STORAGE_DIR, "data_fruity_fruits.json"), "rb") as f_fruity_fr, \
+         open(os.path.join(STORAGE_DIR, "data_bfv_fruits.json"), "rb") as f_bfv_fr, \
+         open(os.path.join(STORAGE_DIR, "data_bfv_skins.json"), "rb") as f_bfv_skins:
+
+        gamepasses_from_fruity = loads(f_fruity_gp.read())
+        gamepasses_from_bfv    = loads(f_bfv_gp.read())
+        fruits_from_fruity     = loads(f_fruity_fr.read())
+        fruits_from_bfv        = loads(f_bfv_fr.read())
+        bfv_skins              = loads(f_bfv_skins.read())
+
+        result["stock"], stock_status = SOURCES["stock"].get(empty={"normal": [], "mirage": []})
+
+        info_fruits = catalog()
 
-        json.dump(result, f_all, indent=2, ensure_ascii=False)
-        return result
+        result["specials"]   = data_bfv_specials
+        result["sources"]    = {"fruity": fruity_status, "bfv": bfv_status, "stock": stock_status}
+        with span("merge", "gamepasses"):
+            result["gamepasses"] = merge_gamepasses_with_averages(gamepasses_from_fruity + gamepasses_from_bfv)
+        with span("merge", "fruits"):
+            result["fruits"] = merge_fruits_with_averages(fruits_from_bfv, fruits_from_fruity, info_fruits, bfv_skins)
+        # point image fields at /img/ (src/images.py); uncached images download in the background
+        result["fruits"] = image_cache.rewrite(result["fruits"])
+
+        with span("serialize", "all"):
+            f_all.write(dumps(result, pretty=PRETTY))
+
+    # swap the in-memory snapshot right away (notifies snapshot listeners)
+    current_snapshot()
+    return result
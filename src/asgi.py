@@ -0,0 +1,341 @@
+import asyncio
+import contextvars
+import io
+import re
+import sys
+import time
+from typing import Optional, Tuple
+from urllib.parse import parse_qs
+
+from werkzeug.http import parse_etags, quote_etag
+
+from . import flask as flask_app
+from .snapshot import current_snapshot, ALL_FILE, SHARED as shared
+from .lookup import entity_index
+from .search import search_index
+from .stock_feed import stock_feed, sse_event, poll_body
+from . import metrics
+from .serializer import dumps
+from .formats import variant_etag, JSON_TYPE
+from .admission import admission, Overloaded, QUEUE_TIMEOUT
+
+# -----------------------------------------------------------------------------
+# ASGI entry point (uvicorn src.asgi:app)
+#
+# Snapshot-backed and streaming routes are served natively on the event loop;
+# everything else is delegated to the Flask app through a WSGI adapter, so the
+# route surface is identical to src/flask.py.
+# -----------------------------------------------------------------------------
+
+JSON = b"application/json"
+BASE_HEADERS = [(b"access-control-allow-origin", b"*")]
+FAILED = dumps({"error": "Failed to fetch data after multiple attempts."})
+STALE = [(b"x-data-stale", b"true")]
+
+_rule = contextvars.ContextVar("rule", default="<asgi>")   # route label for src/admission.py
+
+async def _respond(send, status: int, body: bytes, content_type: bytes = JSON, headers=()) -> None:
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [(b"content-type", content_type), (b"content-length", str(len(body)).encode())]
+                   + BASE_HEADERS + list(headers),
+    })
+    await send({"type": "http.response.body", "body": body})
+
+def _error(message: str) -> bytes:
+    return dumps({"error": message})
+
+# ---- WSGI fallback ----
+
+def _environ(scope, body: bytes):
+    server = scope.get("server") or ("localhost", 80)
+    client = scope.get("client") or ("", 0)
+    environ = {
+        "REQUEST_METHOD": scope["method"],
+        "SCRIPT_NAME": scope.get("root_path", ""),
+        "PATH_INFO": scope["path"].encode("utf-8").decode("latin-1"),
+        "QUERY_STRING": scope.get("query_string", b"").decode("latin-1"),
+        "SERVER_NAME": str(server[0]),
+        "SERVER_PORT": str(server[1] or 80),
+        "REMOTE_ADDR": client[0],
+        "SERVER_PROTOCOL": f"HTTP/{scope.get('http_version', '1.1')}",
+        "wsgi.version": (1, 0),
+        "wsgi.url_scheme": scope.get("scheme", "http"),
+        "wsgi.input": io.BytesIO(body),
+        "wsgi.errors": sys.stderr,
+        "wsgi.multithread": True,
+        "wsgi.multiprocess": False,
+        "wsgi.run_once": False,
+    }
+    for name, value in scope.get("headers") or []:
+        key = name.decode("latin-1").upper().replace("-", "_")
+        if key == "CONTENT_TYPE" or key == "CONTENT_LENGTH":
+            environ[key] = value.decode("latin-1")
+            continue
+        key = f"HTTP_{key}"
+        value = value.decode("latin-1")
+        environ[key] = f"{environ[key]},{value}" if key in environ else value
+    return environ
+
+def _run_wsgi(environ):
+    started = {}
+
+    def start_response(status, headers, exc_info=None):
+        started["status"] = int(status.split(" ", 1)[0])
+        started["headers"] = headers
+
+    result = flask_app.app(environ, start_response)
+    try:
+        body = b"".join(result)
+    finally:
+        if hasattr(result, "close"):
+            result.close()
+    return started["status"], started["headers"], body
+
+async def _wsgi(scope, receive, send) -> None:
+    """Run the Flask app in the default thread pool (buffered response)."""
+    if scope["type"] != "http":
+        return
+    chunks = []
+    while True:
+        message = await receive()
+        if message["type"] == "http.disconnect":
+            return
+        chunks.append(message.get("body", b""))
+        if not message.get("more_body"):
+            break
+    status, headers, body = await asyncio.to_thread(_run_wsgi, _environ(scope, b"".join(chunks)))
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [(k.lower().encode("latin-1"), v.encode("latin-1")) for k, v in headers],
+    })
+    await send({"type": "http.response.body", "body": body})
+
+# ---- refresh without holding a thread per waiting request ----
+
+_all_refresh: Optional[asyncio.Future] = None
+
+def _start_refresh() -> Tuple[asyncio.Future, bool]:
+    """
+    Single-flight get_all() in a worker thread, under the same admission control as
+    the Flask routes. Returns the running refresh and whether this call started it.
+    """
+    global _all_refresh
+    if _all_refresh is not None and not _all_refresh.done():
+        return _all_refresh, False
+    if flask_app.debug:
+        refresh = asyncio.to_thread(flask_app.get_all)
+    else:
+        refresh = asyncio.to_thread(admission.refresh, _rule.get(), ALL_FILE, flask_app.get_all,
+                                    lambda: flask_app._has_data(ALL_FILE))
+    _all_refresh = asyncio.ensure_future(refresh)
+    _all_refresh.add_done_callback(lambda f: f.cancelled() or f.exception())   # nobody may await it; get_all() logs its own errors
+    return _all_refresh, True
+
+async def _all_snapshot():
+    """
+    (snapshot, extra headers) for the native routes. A stale storage/all.json is served
+    as it is, flagged X-Data-Stale, while get_all() runs in the background. Only a request
+    with nothing to serve awaits the refresh: all of it when it started it, otherwise up
+    to QUEUE_TIMEOUT before Overloaded (503 + Retry-After), like the Flask routes.
+    """
+    if shared:
+        snap = current_snapshot()
+        if snap is None:
+            raise Overloaded("No snapshot has been published yet.")
+        return snap, []
+    index = 0
+    while index != 3:
+        if not flask_app.debug and flask_app._cache_hit(ALL_FILE, 600):
+            return current_snapshot(), []
+        refresh, started = _start_refresh()
+        snap = current_snapshot()
+        if not flask_app.debug and snap is not None and flask_app._has_data(ALL_FILE):
+            return snap, STALE
+        try:
+            await asyncio.wait_for(asyncio.shield(refresh), None if started else QUEUE_TIMEOUT)
+        except asyncio.TimeoutError:
+            raise Overloaded("The data is being refreshed; try again shortly.")
+        except Overloaded:
+            raise
+        except Exception as e:
+            print(f"Refresh failed: {e}")
+        if flask_app.debug:
+            return current_snapshot(), []
+        index += 1
+    return None, []
+
+# ---- stock change notifications bridged onto the event loop ----
+
+class _StockWaker:
+    def __init__(self, loop: asyncio.AbstractEventLoop):
+        self.loop = loop
+        self.event = asyncio.Event()
+
+    def wake_threadsafe(self) -> None:
+        self.loop.call_soon_threadsafe(self._fire)
+
+    def _fire(self) -> None:
+        old, self.event = self.event, asyncio.Event()
+        old.set()
+
+_waker: Optional[_StockWaker] = None
+
+def _stock_waker() -> _StockWaker:
+    global _waker
+    if _waker is None:
+        _waker = _StockWaker(asyncio.get_running_loop())
+        stock_feed.on_publish(_waker.wake_threadsafe)
+        stock_feed.ensure_refresher(flask_app._fresh_stock)
+    return _waker
+
+async def _wait_stock(since: str, timeout: float):
+    waker = _stock_waker()
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    while True:
+        state = stock_feed.current()
+        remaining = deadline - loop.time()
+        if (state.id and state.id != since) or remaining <= 0:
+            return state
+        try:
+            await asyncio.wait_for(waker.event.wait(), remaining)
+        except asyncio.TimeoutError:
+            pass
+
+# ---- native routes ----
+
+async def _all(send, query, headers, *_):
+    snap, extra = await _all_snapshot()
+    if snap is None:
+        return await _respond(send, 500, FAILED)
+    # same validators as Flask's _snapshot_response (plain JSON is the only variant served here)
+    etag = variant_etag(snap.generation, JSON_TYPE)
+    extra += [(b"etag", quote_etag(etag).encode("ascii")), (b"x-snapshot-generation", snap.generation.encode("ascii")),
+              (b"vary", b"Accept")]
+    if parse_etags(headers.get(b"if-none-match", b"").decode("latin-1") or None).contains_weak(etag):
+        await send({"type": "http.response.start", "status": 304, "headers": BASE_HEADERS + extra})
+        return await send({"type": "http.response.body", "body": b""})
+    await _respond(send, 200, snap.body if isinstance(snap.body, bytes) else memoryview(snap.body), headers=extra)
+
+def _entity(kind, what):
+    async def handler(send, query, headers, *names):
+        snap, extra = await _all_snapshot()
+        if snap is None:
+            return await _respond(send, 500, FAILED)
+        body = getattr(entity_index(snap), kind)(*names)
+        if body is None:
+            return await _respond(send, 404, _error(f"{what} not found."), headers=extra)
+        await _respond(send, 200, body, headers=extra)
+    return handler
+
+def _int_arg(query, name, default, cast=int):
+    try:
+        return cast(query.get(name, [default])[0])
+    except (TypeError, ValueError):
+        return default
+
+async def _search(send, query, headers, *_):
+    q = query.get("q", [""])[0]
+    limit = min(max(_int_arg(query, "limit", 10), 1), 50)
+    snap, extra = await _all_snapshot()
+    if snap is None:
+        return await _respond(send, 500, FAILED)
+    idx = search_index(snap)
+    results = idx.autocomplete(q, limit) if query.get("mode", [""])[0] == "autocomplete" else idx.search(q, limit)
+    await _respond(send, 200, dumps({"query": q, "results": results}), headers=extra)
+
+async def _stock_poll(send, query, headers, *_):
+    since = query.get("since", [""])[0]
+    timeout = min(max(_int_arg(query, "timeout", 30, float), 0), 60)
+    state = await _wait_stock(since, timeout)
+    await _respond(send, 200, dumps(poll_body(state, since)))
+
+async def _stock_events(send, seen: str) -> None:
+    while True:
+        state = await _wait_stock(seen, 15)
+        if not state.id or state.id == seen or state.stock is None:
+            chunk = ": keepalive\n\n"
+        else:
+            chunk = sse_event(state, seen)
+            seen = state.id
+        await send({"type": "http.response.body", "body": chunk.encode(), "more_body": True})
+
+async def _stock_stream(send, receive, headers) -> None:
+    version = headers.get(b"last-event-id", b"").decode("latin-1")
+    await send({
+        "type": "http.response.start",
+        "status": 200,
+        "headers": [(b"content-type", b"text/event-stream"), (b"cache-control", b"no-cache"),
+                    (b"x-accel-buffering", b"no")] + BASE_HEADERS,
+    })
+
+    async def disconnected():
+        while (await receive())["type"] != "http.disconnect":
+            pass
+
+    # an idle stream costs one suspended task; it ends when the client goes away
+    tasks = {asyncio.ensure_future(_stock_events(send, version)), asyncio.ensure_future(disconnected())}
+    try:
+        await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        for t in tasks:
+            t.cancel()
+
+_BINARY_ACCEPT = re.compile(rb"msgpack|cbor")
+
+ROUTES = [
+    # (pattern, Flask rule used as the metrics label, handler)
+    (re.compile(r"^/all$"), "/all", _all),
+    (re.compile(r"^/fruits/([^/]+)$"), "/fruits/<name>", _entity("fruit", "Fruit")),
+    (re.compile(r"^/skins/([^/]+)/([^/]+)$"), "/skins/<fruit>/<skin>", _entity("skin", "Skin")),
+    (re.compile(r"^/gamepasses/([^/]+)$"), "/gamepasses/<name>", _entity("gamepass", "Gamepass")),
+    (re.compile(r"^/search$"), "/search", _search),
+    (re.compile(r"^/stock/poll$"), "/stock/poll", _stock_poll),
+]
+
+async def _timed(rule, handler, send, query, headers, groups) -> None:
+    """Run a native handler and record its latency like the Flask routes do."""
+    started = time.perf_counter()
+    status = [500]
+
+    async def send_with_status(message):
+        if message["type"] == "http.response.start":
+            status[0] = message["status"]
+        await send(message)
+
+    token = _rule.set(rule)
+    try:
+        await handler(send_with_status, query, headers, *groups)
+    except Overloaded as e:
+        await _respond(send_with_status, 503, _error(str(e)), headers=[(b"retry-after", str(e.retry_after).encode())])
+    finally:
+        _rule.reset(token)
+        metrics.REQUEST_SECONDS.observe(time.perf_counter() - started, rule, "GET", str(status[0]))
+
+async def app(scope, receive, send):
+    if scope["type"] == "lifespan":
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    if scope["type"] == "http" and scope["method"] == "GET":
+        path = scope["path"]
+        query = parse_qs(scope.get("query_string", b"").decode("latin-1"))
+        headers = dict(scope.get("headers") or [])
+        if path == "/stock/stream":
+            return await _stock_stream(send, receive, headers)
+        # binary formats and alternative layouts are negotiated by the Flask app
+        plain = "format" not in query and "layout" not in query and not _BINARY_ACCEPT.search(headers.get(b"accept", b""))
+        for pattern, rule, handler in (ROUTES if plain else ()):
+            m = pattern.match(path)
+            if m:
+                return await _timed(rule, handler, send, query, headers, m.groups())
+
+    await _wsgi(scope, receive, send)
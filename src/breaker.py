@@ -0,0 +1,104 @@
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from .manager import read_file, write_file
+from . import metrics
+
+# -----------------------------------------------------------------------------
+# Per-source circuit breakers with last-known-good fallback
+# -----------------------------------------------------------------------------
+
+LKG_DIR = "storage/lkg"
+FAILURE_THRESHOLD = int(os.environ.get("BREAKER_FAILURES", "3"))      # consecutive failures before opening
+PROBE_INTERVAL = float(os.environ.get("BREAKER_PROBE_INTERVAL", "60"))  # first background probe delay (s)
+MAX_PROBE_INTERVAL = float(os.environ.get("BREAKER_MAX_PROBE_INTERVAL", "900"))
+
+CLOSED, OPEN = "closed", "open"
+
+SOURCE_FAILURES = metrics.Counter("source_failures_total", "Failed upstream fetches by source.", ("source",))
+SOURCE_FALLBACKS = metrics.Counter("source_fallbacks_total", "Refreshes served from last-known-good data.", ("source",))
+
+class Source:
+    """
+    One upstream behind a circuit breaker.
+
+    `fetch()` returns the source's normalized data or raises. After FAILURE_THRESHOLD
+    consecutive failures the breaker opens: get() stops calling upstream and returns
+    the last-known-good data right away, while a background thread probes with
+    exponential backoff and closes the breaker on the first success.
+    """
+
+    def __init__(self, name: str, fetch: Callable[[], Any]):
+        self.name = name
+        self.fetch = fetch
+        self.state = CLOSED
+        self.failures = 0
+        self._lock = threading.Lock()
+        self._prober: Optional[threading.Thread] = None
+        self._lkg: Optional[Dict[str, Any]] = None   # {"fetchedAt": epoch, "data": ...}
+
+    @property
+    def lkg_path(self) -> str:
+        return os.path.join(LKG_DIR, f"{self.name}.json")
+
+    def last_known_good(self) -> Optional[Dict[str, Any]]:
+        if self._lkg is None and os.path.exists(self.lkg_path):
+            stored = read_file(self.lkg_path)
+            if isinstance(stored, dict) and "data" in stored:
+                self._lkg = stored
+        return self._lkg
+
+    def _succeeded(self, data) -> None:
+        self._lkg = {"fetchedAt": int(time.time()), "data": data}
+        write_file(self.lkg_path, self._lkg)
+        with self._lock:
+            self.state, self.failures = CLOSED, 0
+
+    def _failed(self, e: Exception) -> None:
+        SOURCE_FAILURES.inc(self.name)
+        print(f"Source {self.name} failed: {e}")
+        with self._lock:
+            self.failures += 1
+            if self.state == CLOSED and self.failures >= FAILURE_THRESHOLD:
+                self.state = OPEN
+                print(f"Source {self.name}: circuit opened after {self.failures} failures")
+                self._start_prober()
+
+    def _start_prober(self) -> None:
+        if self._prober is not None and self._prober.is_alive():
+            return
+
+        def probe():
+            delay = PROBE_INTERVAL
+            while self.state == OPEN:
+                time.sleep(delay)
+                try:
+                    self._succeeded(self.fetch())
+                    print(f"Source {self.name}: circuit closed")
+                except Exception as e:
+                    SOURCE_FAILURES.inc(self.name)
+                    print(f"Source {self.name}: probe failed: {e}")
+                    delay = min(delay * 2, MAX_PROBE_INTERVAL)
+
+        self._prober = threading.Thread(target=probe, name=f"breaker-{self.name}", daemon=True)
+        self._prober.start()
+
+    def get(self, empty=None) -> Tuple[Any, Dict[str, Any]]:
+        """
+        Return (data, status). status is {"stale": False} for fresh data, otherwise
+        {"stale": True, "lastGood": <epoch of the data or None>, "breaker": state}.
+        `empty` is returned when there is nothing to fall back to.
+        """
+        if self.state != OPEN:
+            try:
+                data = self.fetch()
+                self._succeeded(data)
+                return data, {"stale": False}
+            except Exception as e:
+                self._failed(e)
+        SOURCE_FALLBACKS.inc(self.name)
+        lkg = self.last_known_good()
+        status = {"stale": True, "lastGood": lkg["fetchedAt"] if lkg else None, "breaker": self.state}
+        return (lkg["data"] if lkg else empty), status
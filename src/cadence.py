@@ -0,0 +1,137 @@
+import hashlib
+import os
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+from . import metrics
+from .stock_schedule import last_rotation
+
+# -----------------------------------------------------------------------------
+# Adaptive refresh TTLs learned from how often each dataset actually changes
+# -----------------------------------------------------------------------------
+
+BACKOFF = 1.5      # TTL growth after a refresh that brought nothing new
+FRACTION = 0.25    # TTL target as a fraction of the observed change interval
+SMOOTHING = 0.3    # weight of the newest interval in the moving average
+
+# dataset -> (min, max) TTL in seconds; override with REFRESH_MIN_<NAME> / REFRESH_MAX_<NAME>
+BOUNDS = {
+    "fruits": (900, 21600),
+    "stock": (60, 1800),
+    "all": (120, 3600),
+}
+
+REFRESHES = metrics.Counter("refreshes_total", "Storage file rewrites by dataset and whether the content changed.",
+                            ("dataset", "result"))
+
+def _stock_changed(now: float) -> float:
+    """Last rotation, or the last time stock.json was seen with new content if that is later."""
+    c = _cadences.get("storage/stock.json")
+    if c is not None:
+        c.observe()
+    return max(last_rotation(now), (c and c.changed_at) or 0)
+
+# never served across a stock rotation; all.json also goes stale when newer stock was written
+BOUNDARIES: Dict[str, Callable[[float], float]] = {
+    "stock": last_rotation,
+    "all": _stock_changed,
+}
+
+class Cadence:
+    """
+    TTL for one storage file. Every time the file is rewritten its content hash is
+    compared with the previous one: an unchanged refresh stretches the TTL (up to
+    the max), a change resets it to FRACTION of the average time between changes
+    (down to the min).
+    """
+
+    def __init__(self, path: str, default_ttl: float, min_ttl: float, max_ttl: float,
+                 boundary: Optional[Callable[[float], float]] = None):
+        self.path = path
+        self.name = os.path.splitext(os.path.basename(path))[0]
+        self.min_ttl, self.max_ttl = min_ttl, max_ttl
+        self.ttl = self._clamp(default_ttl)
+        self.boundary = boundary
+        self.change_interval: Optional[float] = None   # moving average, seconds
+        self._mtime: Optional[float] = None
+        self._hash: Optional[bytes] = None
+        self.changed_at: Optional[float] = None   # mtime of the last change seen by this process
+        self._lock = threading.Lock()
+
+    def _clamp(self, ttl: float) -> float:
+        return max(self.min_ttl, min(self.max_ttl, ttl))
+
+    def observe(self) -> None:
+        """Learn from the file if it was rewritten since the last look."""
+        try:
+            mtime = os.path.getmtime(self.path)
+        except FileNotFoundError:
+            return
+        if mtime == self._mtime:
+            return
+        with self._lock:
+            if mtime == self._mtime:
+                return
+            try:
+                with open(self.path, "rb") as f:
+                    digest = hashlib.sha1(f.read()).digest()
+            except OSError:
+                return
+            previous, self._mtime = self._mtime, mtime
+            if self._hash is None:
+                self._hash = digest
+                return
+            if digest == self._hash:
+                REFRESHES.inc(self.name, "unchanged")
+                self.ttl = self._clamp(self.ttl * BACKOFF)
+                return
+            REFRESHES.inc(self.name, "changed")
+            self._hash = digest
+            if self.changed_at is not None:
+                # the change happened somewhere between the previous rewrite and this one
+                interval = (previous + mtime) / 2 - self.changed_at
+                self.change_interval = interval if self.change_interval is None else \
+                    (1 - SMOOTHING) * self.change_interval + SMOOTHING * interval
+                self.ttl = self._clamp(self.change_interval * FRACTION)
+            self.changed_at = mtime
+
+    def fresh(self, now: Optional[float] = None) -> bool:
+        """True while the file is younger than the learned TTL and no rotation boundary has passed."""
+        self.observe()
+        now = time.time() if now is None else now
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return False
+        if st.st_size <= 2:  # not empty {}
+            return False
+        if now - st.st_mtime >= self.ttl:
+            return False
+        if self.boundary is not None and self.boundary(now) > st.st_mtime:
+            return False
+        return True
+
+    def state(self) -> Dict[str, Optional[float]]:
+        return {"ttl": round(self.ttl, 1), "changeInterval": self.change_interval and round(self.change_interval, 1),
+                "min": self.min_ttl, "max": self.max_ttl}
+
+_cadences: Dict[str, Cadence] = {}
+_cadences_lock = threading.Lock()
+
+def cadence_for(path: str, default_ttl: float) -> Cadence:
+    """The Cadence of a storage file, created on first use with the route's TTL as the starting point."""
+    c = _cadences.get(path)
+    if c is None:
+        with _cadences_lock:
+            c = _cadences.get(path)
+            if c is None:
+                name = os.path.splitext(os.path.basename(path))[0]
+                lo, hi = BOUNDS.get(name, (default_ttl, default_ttl))
+                lo = float(os.environ.get(f"REFRESH_MIN_{name.upper()}", lo))
+                hi = float(os.environ.get(f"REFRESH_MAX_{name.upper()}", hi))
+                c = _cadences[path] = Cadence(path, default_ttl, lo, hi, BOUNDARIES.get(name))
+    return c
+
+def cadences() -> Dict[str, Dict[str, Optional[float]]]:
+    return {path: c.state() for path, c in _cadences.items()}
@@ -0,0 +1,83 @@
+import hashlib
+import json
+import os
+import threading
+from types import MappingProxyType
+from typing import Any, Dict, Iterator, Mapping, Optional, Tuple
+
+from .names import normalize_name_words, fruit_key
+from .serializer import dumps
+
+# -----------------------------------------------------------------------------
+# Static fruit catalog (src/data/fruits_info.json), loaded once and frozen
+# -----------------------------------------------------------------------------
+
+CATALOG_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "fruits_info.json")
+
+def _freeze(obj):
+    if isinstance(obj, dict):
+        return MappingProxyType({k: _freeze(v) for k, v in obj.items()})
+    if isinstance(obj, list):
+        return tuple(_freeze(v) for v in obj)
+    return obj
+
+def thaw(obj):
+    """Mutable (JSON-serializable) copy of a frozen catalog value."""
+    if isinstance(obj, Mapping):
+        return {k: thaw(v) for k, v in obj.items()}
+    if isinstance(obj, tuple):
+        return [thaw(v) for v in obj]
+    return obj
+
+def build_indexes(fruits) -> Tuple[Dict[str, Mapping[str, Any]], Dict[str, str]]:
+    """(fruit key -> record, skin key -> fruit key) of a list of catalog fruits."""
+    by_fruit: Dict[str, Mapping[str, Any]] = {}
+    skin_to_fruit: Dict[str, str] = {}
+    for f in fruits:
+        if not f.get("name"):
+            continue
+        fkey = fruit_key(f["name"])
+        by_fruit[fkey] = f
+        for s in (f.get("skins") or ()):
+            if s.get("name"):
+                skin_to_fruit[normalize_name_words(s["name"])] = fkey
+    return by_fruit, skin_to_fruit
+
+class Catalog:
+    """
+    Read-only fruit catalog. Iterates like the old info.json list and carries the
+    indexes the merge needs, plus the serialized body served by /info.
+    """
+
+    def __init__(self, version: Any, fruits: list):
+        self.version = version
+        self.body = dumps(fruits)
+        self.etag = f"{version}-{hashlib.sha1(self.body).hexdigest()[:12]}"
+        self.fruits: Tuple[Mapping[str, Any], ...] = _freeze(fruits)
+
+        by_fruit, skin_to_fruit = build_indexes(self.fruits)
+        self.by_fruit = MappingProxyType(by_fruit)            # canonical fruit key -> record
+        self.skin_to_fruit = MappingProxyType(skin_to_fruit)  # skin key -> canonical fruit key
+
+    def __iter__(self) -> Iterator[Mapping[str, Any]]:
+        return iter(self.fruits)
+
+    def __len__(self) -> int:
+        return len(self.fruits)
+
+_catalog: Optional[Catalog] = None
+_catalog_lock = threading.Lock()
+
+def load_catalog(path: str = CATALOG_FILE) -> Catalog:
+    with open(path, encoding="utf-8") as f:
+        doc = json.load(f)
+    return Catalog(doc.get("version"), doc.get("fruits") or [])
+
+def catalog() -> Catalog:
+    """The process-wide catalog, loaded on first use."""
+    global _catalog
+    if _catalog is None:
+        with _catalog_lock:
+            if _catalog is None:
+                _catalog = load_catalog()
+    return _catalog
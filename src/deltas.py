@@ -0,0 +1,155 @@
+import os
+import threading
+from collections import deque
+from typing import Any, Dict, List, Optional
+
+from .snapshot import Snapshot, on_swap, SHARED, SHARED_DIR, _replace_atomically
+from .serializer import dumps, loads
+
+# -----------------------------------------------------------------------------
+# JSON-Patch (RFC 6902) deltas between consecutive snapshot generations
+# -----------------------------------------------------------------------------
+
+HISTORY = int(os.environ.get("DIFF_HISTORY", "16"))   # generations a client can lag behind
+DELTAS_FILE = os.path.join(SHARED_DIR, "deltas.json")  # shared mode: the refresher's history, read by workers
+
+def _escape(key: str) -> str:
+    return str(key).replace("~", "~0").replace("/", "~1")
+
+def _named(items) -> Optional[List[str]]:
+    """Names of a list of records when every item has a unique name, else None."""
+    names = [it.get("name") if isinstance(it, dict) else None for it in items]
+    if not names or None in names or len(set(names)) != len(names):
+        return None
+    return names
+
+def _diff_named_list(path: str, old: list, new: list, ops: List[Dict[str, Any]]) -> bool:
+    """
+    Diff lists of named records (fruits, skins, gamepasses) by name: removals, then
+    insertions at their final index, then nested changes. Returns False when the
+    surviving records were reordered (the caller replaces the list instead).
+    """
+    old_names, new_names = _named(old), _named(new)
+    if old_names is None or new_names is None:
+        return False
+    new_set, old_set = set(new_names), set(old_names)
+    kept = [n for n in old_names if n in new_set]
+    if kept != [n for n in new_names if n in old_set]:
+        return False
+    for i in range(len(old) - 1, -1, -1):
+        if old_names[i] not in new_set:
+            ops.append({"op": "remove", "path": f"{path}/{i}"})
+    for i, n in enumerate(new_names):
+        if n not in old_set:
+            ops.append({"op": "add", "path": f"{path}/{i}", "value": new[i]})
+    old_by_name = dict(zip(old_names, old))
+    for i, n in enumerate(new_names):
+        if n in old_set:
+            diff(old_by_name[n], new[i], f"{path}/{i}", ops)
+    return True
+
+def diff(old: Any, new: Any, path: str = "", ops: Optional[List[Dict[str, Any]]] = None) -> List[Dict[str, Any]]:
+    """Return the JSON-Patch operations turning `old` into `new`."""
+    if ops is None:
+        ops = []
+    if old == new:
+        return ops
+    if isinstance(old, dict) and isinstance(new, dict):
+        for k in old:
+            if k not in new:
+                ops.append({"op": "remove", "path": f"{path}/{_escape(k)}"})
+        for k, v in new.items():
+            if k not in old:
+                ops.append({"op": "add", "path": f"{path}/{_escape(k)}", "value": v})
+            else:
+                diff(old[k], v, f"{path}/{_escape(k)}", ops)
+        return ops
+    if isinstance(old, list) and isinstance(new, list):
+        if len(old) == len(new) and _named(old) == _named(new):
+            for i, (a, b) in enumerate(zip(old, new)):
+                diff(a, b, f"{path}/{i}", ops)
+            return ops
+        if _diff_named_list(path, old, new, ops):
+            return ops
+    ops.append({"op": "replace", "path": path, "value": new})
+    return ops
+
+# ---- per-refresh history ----
+
+_history = deque(maxlen=HISTORY)   # (from_generation, to_generation, ops)
+_history_lock = threading.Lock()
+_publisher = False                 # shared mode: this process is the refresher
+_shared_history = (None, [])       # worker side: (DELTAS_FILE signature, history)
+
+def publish_history() -> None:
+    """
+    Make this process (the shared-mode refresher) compute the deltas and write them to
+    DELTAS_FILE, so workers serve /all/diff from one history instead of each diffing
+    every generation itself. Picks up the history of the previous run.
+    """
+    global _publisher
+    _publisher = True
+    with _history_lock:
+        _history.clear()
+        _history.extend(tuple(h) for h in _read_shared())
+
+def _read_shared() -> list:
+    global _shared_history
+    try:
+        st = os.stat(DELTAS_FILE)
+    except FileNotFoundError:
+        return []
+    sig = (st.st_mtime_ns, st.st_size)
+    if _shared_history[0] != sig:
+        try:
+            with open(DELTAS_FILE, "rb") as f:
+                history = loads(f.read())
+        except (OSError, ValueError) as e:
+            print(f"Error loading {DELTAS_FILE}: {e}")
+            return _shared_history[1]
+        _shared_history = (sig, history if isinstance(history, list) else [])
+    return _shared_history[1]
+
+def _record(old: Optional[Snapshot], new: Snapshot) -> None:
+    if old is None or (SHARED and not _publisher):
+        return
+    ops = diff(old.data, new.data)
+    with _history_lock:
+        _history.append((old.generation, new.generation, ops))
+        if _publisher:
+            _replace_atomically(DELTAS_FILE, dumps([list(h) for h in _history]))
+
+on_swap(_record)
+
+def _chain() -> list:
+    if SHARED and not _publisher:
+        return _read_shared()
+    with _history_lock:
+        return list(_history)
+
+def delta_since(snapshot: Snapshot, since: str) -> Optional[List[Dict[str, Any]]]:
+    """
+    Operations taking generation `since` to `snapshot`, composed from the cached
+    per-refresh deltas. None when `since` is unknown or too old.
+    """
+    if since == snapshot.generation:
+        return []
+
+    def build(s):
+        chain = _chain()
+        ops, current = [], None
+        for frm, to, step in chain:
+            if current is None and frm != since:
+                continue
+            if current is not None and frm != current:
+                break  # gap in the history
+            ops.extend(step)
+            current = to
+        if current != s.generation:
+            raise LookupError(since)  # not cached: the history may still catch up
+        return ops
+
+    try:
+        return snapshot.derived(f"delta:{since}", build)
+    except LookupError:
+        return None
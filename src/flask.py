@@ -1,14 +1,197 @@
-from flask import Flask
+import threading
+import time
+from flask import Flask, Response, request, stream_with_context, g, send_file, has_request_context
+from flask.json.provider import DefaultJSONProvider
 from flask_cors import CORS
 import os
-from .fruits_scraper_fruity import get_fruits
-from .stock_scraper import get_stock_all
-from .manager import read_file, write_file, check_file_validity, write_fruits_info_file
-from .all import get_all
+from .manager import read_file, write_file, check_file_validity
+from .catalog import catalog
+from .cadence import cadence_for
+from .snapshot import current_snapshot, SHARED as shared
+from .lookup import entity_index
+from .search import search_index
+from .trade import price_vector, invalid_trade, MAX_TRADES_PER_REQUEST
+from .stock_feed import stock_feed, sse_event, poll_body
+from .stock_schedule import StockScheduler, next_rotation
+from .fragments import file_fragment, compose
+from .admission import admission, Overloaded, RETRY_AFTER
+from .formats import negotiate, encode_json_body, encode_snapshot, variant_etag, JSON_TYPE, LAYOUTS
+from .deltas import delta_since
+from . import webhooks
+from . import metrics
+from . import profiling
+from . import serializer
+from .images import HASH_RE, THUMB_SIZES, image_path, sniff_type, touch
+
+class FastJSONProvider(DefaultJSONProvider):
+    """Flask JSON through src/serializer.py: response bodies are encoded straight to bytes."""
+
+    def dumps(self, obj, **kwargs):
+        return serializer.dumps(obj, sort_keys=self.sort_keys, default=self.default).decode("utf-8")
+
+    def loads(self, s, **kwargs):
+        return serializer.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        pretty = (self.compact is None and self._app.debug) or self.compact is False
+        body = serializer.dumps(obj, pretty=pretty, sort_keys=self.sort_keys, default=self.default)
+        return self._app.response_class(body, mimetype=self.mimetype)
 
 app = Flask(__name__)
+app.json = FastJSONProvider(app)
 CORS(app, resources={r"/*": {"origins": ["http://localhost:3000", "https://bfft.app.abledtaha.online", "*"]}})
 debug = os.getenv("DEBUG", "False").lower() in ("true", "1", "t")
+admin_token = os.getenv("ADMIN_TOKEN", "")
+fast_start = os.getenv("FAST_START", "False").lower() in ("true", "1", "t")
+IMAGE_MAX_AGE = 365 * 86400   # /img/<hash> is content-addressed, so it never changes
+stock_scheduling = os.getenv("STOCK_SCHEDULER", "True").lower() in ("true", "1", "t")
+stock_waiters = int(os.getenv("STOCK_WAITERS_MAX", "8"))   # concurrent /stock/stream + /stock/poll clients
+
+# with shared snapshots the refresher process (src/workers.py) owns refreshing and notifications
+if not shared:
+    webhooks.install(stock_feed)
+
+# ---- scrapers are imported on first use: requests and BeautifulSoup dominate import time ----
+
+def get_fruits():
+    from .fruits_scraper_fruity import get_fruits
+    return get_fruits()
+
+def fetch_stock():
+    from .stock_scraper import fetch_stock
+    return fetch_stock()
+
+def refresh_stock():
+    from .stock_scraper import refresh_stock
+    return refresh_stock()
+
+def write_stock(snap):
+    from .stock_scraper import write_stock
+    return write_stock(snap)
+
+def get_all():
+    from .all import get_all
+    return get_all()
+
+def _admin_error():
+    """Admin routes are disabled unless ADMIN_TOKEN is set, and then require it in X-Admin-Token."""
+    if not admin_token:
+        return {"error": "Admin endpoints are disabled (ADMIN_TOKEN is not set)."}, 403
+    if request.headers.get("X-Admin-Token") != admin_token:
+        return {"error": "Invalid admin token."}, 401
+    return None
+
+_warming = threading.Event()   # set while the FAST_START background refresh runs
+
+def _cache_hit(path, ttl):
+    """
+    Whether a storage file is fresh under its learned cadence (src/cadence.py, `ttl` is
+    the starting point), counted as a cache hit/miss for /metrics. During the FAST_START
+    warm-up a stale file that still has content is served as is ("stale").
+    """
+    valid = cadence_for(path, ttl).fresh()
+    result = "hit" if valid else "miss"
+    if not valid and _warming.is_set() and check_file_validity(path, float("inf")):
+        valid, result = True, "stale"
+        _mark_stale()
+    metrics.CACHE_REQUESTS.inc(os.path.splitext(os.path.basename(path))[0], result)
+    return valid
+
+def _has_data(path):
+    try:
+        return os.path.getsize(path) > 2   # not empty {}
+    except OSError:
+        return False
+
+def _mark_stale():
+    if has_request_context():
+        g.stale = True
+
+def _refresh(path, refresh):
+    """
+    Run a stale file's refresh under admission control (src/admission.py). False when
+    the refresh slots are busy and the file on disk should be served as it is (flagged
+    stale); raises Overloaded when there is nothing on disk to serve.
+    """
+    route = request.url_rule.rule if has_request_context() and request.url_rule else "<background>"
+    if admission.refresh(route, path, refresh, lambda: _has_data(path)):
+        return True
+    _mark_stale()
+    return False
+
+@app.errorhandler(Overloaded)
+def overloaded(e):
+    return {"error": str(e)}, 503, {"Retry-After": str(e.retry_after)}
+
+@app.before_request
+def start_timer():
+    g.started = time.perf_counter()
+
+# registered before negotiate_format so it runs after it (Flask runs these in reverse)
+@app.after_request
+def record_latency(resp):
+    started = g.get("started")
+    if started is not None:
+        route = request.url_rule.rule if request.url_rule else "<unmatched>"
+        metrics.REQUEST_SECONDS.observe(time.perf_counter() - started, route, request.method, str(resp.status_code))
+    return resp
+
+@app.after_request
+def flag_stale(resp):
+    if g.get("stale"):
+        resp.headers["X-Data-Stale"] = "true"
+    return resp
+
+def _variant():
+    """(media type, layout) the request asked for; unknown layouts are ignored."""
+    layout = request.args.get("layout", "")
+    return negotiate(request.accept_mimetypes, request.args.get("format")), layout if layout in LAYOUTS else ""
+
+def _conditional(resp, etag):
+    """
+    Tag a pre-serialized JSON response with the ETag of the encoding negotiate_format
+    will turn it into, and answer If-None-Match. Vary is set here because a 304 skips
+    negotiate_format.
+    """
+    resp.set_etag(etag)
+    resp.vary.add("Accept")
+    return resp.make_conditional(request)
+
+@app.after_request
+def negotiate_format(resp):
+    """Content negotiation for every JSON route: MessagePack/CBOR via Accept or ?format=, columnar via ?layout=."""
+    if (resp.mimetype != JSON_TYPE or resp.is_streamed or resp.status_code == 304
+            or "Content-Encoding" in resp.headers):
+        return resp
+    resp.vary.add("Accept")
+    mimetype, layout = _variant()
+    snap = g.get("snapshot")
+    try:
+        if snap is not None and (mimetype != JSON_TYPE or layout):
+            body = encode_snapshot(snap, mimetype, layout)
+        elif mimetype != JSON_TYPE:
+            body = encode_json_body(resp.get_data(), mimetype)
+        else:
+            return resp
+    except ValueError as e:
+        print(f"Cannot encode response as {mimetype}: {e}")
+        return resp
+    resp.set_data(body)
+    resp.mimetype = mimetype
+    return resp
+
+metrics.Gauge("snapshot_age_seconds", "Seconds since the served /all snapshot was loaded.",
+              lambda: time.time() - current_snapshot().loaded_at)
+metrics.Gauge("stock_feed_version", "Stock change feed version (bumps on every rotation).",
+              lambda: stock_feed.version)
+metrics.Gauge("stock_next_rotation_seconds", "Seconds until the next stock rotation.",
+              lambda: next_rotation(time.time())[0] - time.time())
+
+@app.route("/metrics")
+def metrics_endpoint():
+    """Prometheus text exposition: refresh stage timings, request latency, cache hits/misses."""
+    return Response(metrics.render(), content_type="text/plain; version=0.0.4; charset=utf-8")
 
 @app.route("/")
 def index():
@@ -17,48 +200,380 @@ def index():
 @app.route("/fruits")
 def fruits():
     index = 0
+    if shared:
+        return read_file("storage/fruits.json")
     if not debug:
         while index != 3:
-            if check_file_validity("storage/fruits.json", 7200):
+            if _cache_hit("storage/fruits.json", 7200) or not _refresh(
+                    "storage/fruits.json", lambda: write_file("storage/fruits.json", get_fruits())):
                 return read_file("storage/fruits.json")
-            write_file("storage/fruits.json", get_fruits())
             index += 1
     elif debug:
         return get_fruits()
     return {"error": "Failed to fetch data after multiple attempts."}, 500
 
-@app.route("/stock")
-def stock():
+def _fresh_stock():
+    """Return the stock under the /stock caching policy and publish it to the change feed."""
     index = 0
-    if not debug:
+    data = None
+    if shared:
+        data = read_file("storage/stock.json")
+    elif not debug:
         while index != 3:
-            if check_file_validity("storage/stock.json", 600):
-                return read_file("storage/stock.json")
-            write_file("storage/stock.json", get_stock_all())
+            if _cache_hit("storage/stock.json", 600) or not _refresh(
+                    "storage/stock.json", refresh_stock):
+                data = read_file("storage/stock.json")
+                break
             index += 1
     elif debug:
-        return get_stock_all()
-    return {"error": "Failed to fetch data after multiple attempts."}, 500
+        data = refresh_stock()
+    if data is not None:
+        stock_feed.publish(data)
+    return data
+
+@app.route("/stock")
+def stock():
+    data = _fresh_stock()
+    if data is None:
+        return {"error": "Failed to fetch data after multiple attempts."}, 500
+    if request.args.get("detail") == "full":
+        # written by the same parse as stock.json (src/stock_scraper.py)
+        detail = read_file("storage/stock_full.json")
+        if not detail:
+            return {"error": "Stock details are not available yet."}, 503
+        return detail
+    return data
+
+# every open stream and long-poll holds a server thread; past this many new ones get a 503
+_waiter_slots = threading.BoundedSemaphore(stock_waiters)
+
+def _no_waiter_slot():
+    return {"error": "Too many open stock streams; try again shortly."}, 503, {"Retry-After": str(RETRY_AFTER)}
+
+@app.route("/stock/poll")
+def stock_poll():
+    """Long-poll: returns as soon as the stock ID differs from `since`, or after `timeout` seconds."""
+    if not _waiter_slots.acquire(blocking=False):
+        return _no_waiter_slot()
+    try:
+        stock_feed.ensure_refresher(_fresh_stock)
+        since = request.args.get("since", "")
+        timeout = min(max(request.args.get("timeout", 30, type=float), 0), 60)
+        return poll_body(stock_feed.wait(since, timeout), since)
+    finally:
+        _waiter_slots.release()
+
+@app.route("/stock/stream")
+def stock_stream():
+    """Server-sent events: a `snapshot` event first, then a `diff` event per stock rotation."""
+    if not _waiter_slots.acquire(blocking=False):
+        return _no_waiter_slot()
+    stock_feed.ensure_refresher(_fresh_stock)
+    last_id = request.headers.get("Last-Event-ID", "")
+
+    def events():
+        seen = last_id
+        while True:
+            state = stock_feed.wait(seen, 15)
+            if not state.id or state.id == seen:
+                yield ": keepalive\n\n"
+                continue
+            yield sse_event(state, seen)
+            seen = state.id
+
+    headers = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    resp = Response(stream_with_context(events()), mimetype="text/event-stream", headers=headers)
+    resp.call_on_close(_waiter_slots.release)   # when the client goes away
+    return resp
+
+@app.route("/img/<digest>")
+def image(digest):
+    """A cached image by content hash; ?size= picks a thumbnail when there is one."""
+    if not HASH_RE.match(digest):
+        return {"error": "Unknown image."}, 404
+    size = request.args.get("size", type=int)
+    path = image_path(digest, size) if size in THUMB_SIZES else None
+    if path is None or not os.path.exists(path):
+        path = image_path(digest)
+    try:
+        with open(path, "rb") as f:
+            head = f.read(512)
+    except FileNotFoundError:
+        return {"error": "Unknown image."}, 404
+    touch(path)
+    resp = send_file(os.path.abspath(path), mimetype=sniff_type(head), max_age=IMAGE_MAX_AGE,
+                     etag=os.path.basename(path))
+    resp.cache_control.public = True
+    resp.cache_control.immutable = True
+    # served from the API origin: never let a cached file run as a document
+    resp.headers["Content-Security-Policy"] = "sandbox"
+    resp.headers["X-Content-Type-Options"] = "nosniff"
+    return resp
 
 @app.route("/info")
 def info():
-    index = 0
-    while index != 3:
-        if check_file_validity("storage/info.json", 86400):
-            return read_file("storage/info.json")
-        write_fruits_info_file()
-        index += 1
-    return {"error": "Failed to fetch data after multiple attempts."}, 500
+    """The static fruit catalog, served from its pre-serialized bytes."""
+    cat = catalog()
+    resp = Response(cat.body, mimetype="application/json")
+    resp.headers["X-Catalog-Version"] = str(cat.version)
+    return _conditional(resp, variant_etag(cat.etag, _variant()[0]))   # layouts do not apply to /info
 
 @app.route("/all")
 def all():
     index = 0
+    if shared:
+        return _snapshot_response(_published_snapshot())
     if not debug:
         while index != 3:
-            if check_file_validity("storage/all.json", 600):
-                return read_file("storage/all.json")
-            get_all()
+            if _cache_hit("storage/all.json", 600) or not _refresh("storage/all.json", get_all):
+                snap = current_snapshot()
+                return _snapshot_response(snap) if snap is not None else read_file("storage/all.json")
             index += 1
     elif debug:
         return get_all()
-    return {"error": "Failed to fetch data after multiple attempts."}, 500
\ No newline at end of file
+    return {"error": "Failed to fetch data after multiple attempts."}, 500
+
+def _published_snapshot():
+    """Shared mode: the current generation; 503 + Retry-After (Overloaded) before the first publish."""
+    snap = current_snapshot()
+    if snap is None:
+        raise Overloaded("No snapshot has been published yet.")
+    return snap
+
+def _all_snapshot():
+    """Make sure storage/all.json is fresh (same policy as /all) and return its snapshot."""
+    index = 0
+    if shared:
+        return _published_snapshot()
+    if not debug:
+        while index != 3:
+            if _cache_hit("storage/all.json", 600) or not _refresh("storage/all.json", get_all):
+                return current_snapshot()
+            index += 1
+    elif debug:
+        get_all()
+        return current_snapshot()
+    return None
+
+def _snapshot_response(snap):
+    """Serve the snapshot document as is (a mapped snapshot is passed through without copying)."""
+    g.snapshot = snap
+    body = snap.body if isinstance(snap.body, bytes) else memoryview(snap.body)
+    resp = Response([body], mimetype="application/json")
+    resp.content_length = len(body)
+    resp.headers["X-Snapshot-Generation"] = snap.generation
+    return _conditional(resp, variant_etag(snap.generation, *_variant()))   # each encoding has its own ETag
+
+def _entity_response(body, what):
+    if body is None:
+        return {"error": f"{what} not found."}, 404
+    return Response(body, mimetype="application/json")
+
+@app.route("/fruits/<name>")
+def fruit_by_name(name):
+    snap = _all_snapshot()
+    if snap is None:
+        return {"error": "Failed to fetch data after multiple attempts."}, 500
+    return _entity_response(entity_index(snap).fruit(name), "Fruit")
+
+@app.route("/skins/<fruit>/<skin>")
+def skin_by_name(fruit, skin):
+    snap = _all_snapshot()
+    if snap is None:
+        return {"error": "Failed to fetch data after multiple attempts."}, 500
+    return _entity_response(entity_index(snap).skin(fruit, skin), "Skin")
+
+@app.route("/gamepasses/<name>")
+def gamepass_by_name(name):
+    snap = _all_snapshot()
+    if snap is None:
+        return {"error": "Failed to fetch data after multiple attempts."}, 500
+    return _entity_response(entity_index(snap).gamepass(name), "Gamepass")
+
+@app.route("/search")
+def search():
+    q = request.args.get("q", "")
+    limit = min(max(request.args.get("limit", 10, type=int), 1), 50)
+    snap = _all_snapshot()
+    if snap is None:
+        return {"error": "Failed to fetch data after multiple attempts."}, 500
+    idx = search_index(snap)
+    if request.args.get("mode") == "autocomplete":
+        results = idx.autocomplete(q, limit)
+    else:
+        results = idx.search(q, limit)
+    return {"query": q, "results": results}
+
+@app.route("/trade/evaluate", methods=["POST"])
+def trade_evaluate():
+    body = request.get_json(silent=True)
+    if not isinstance(body, dict):
+        return {"error": "Expected a JSON object."}, 400
+    trades = body.get("trades")
+    if trades is not None and (not isinstance(trades, list) or len(trades) > MAX_TRADES_PER_REQUEST):
+        return {"error": f"'trades' must be a list of at most {MAX_TRADES_PER_REQUEST} trades."}, 400
+    for i, t in enumerate(trades if trades is not None else [body]):
+        bad = invalid_trade(t)
+        if bad:
+            where = ".".join(p for p in (f"trades[{i}]" if trades is not None else "", bad[0]) if p)
+            return {"error": f"{where}: {bad[1]}" if where else bad[1]}, 400
+
+    snap = _all_snapshot()
+    if snap is None:
+        return {"error": "Failed to fetch data after multiple attempts."}, 500
+    prices = price_vector(snap)
+    if trades is None:
+        return prices.evaluate(body)
+    return {"results": [prices.evaluate(t) for t in trades]}
+
+@app.route("/webhooks", methods=["GET", "POST"])
+def webhooks_registry():
+    err = _admin_error()
+    if err: return err
+    if request.method == "GET":
+        return {"webhooks": webhooks.list_subscriptions(), "dropped": webhooks.dispatcher.dropped,
+                "delivered": webhooks.dispatcher.delivered, "failed": webhooks.dispatcher.failed}
+    body = request.get_json(silent=True) or {}
+    try:
+        sub = webhooks.add_subscription(body.get("url"), body.get("events"), body.get("threshold"))
+    except (ValueError, TypeError) as e:
+        return {"error": str(e)}, 400
+    return sub, 201
+
+@app.route("/admin/profiles", methods=["GET", "POST"])
+def profiles():
+    """GET lists saved refresh profiles; POST {"runs": N, "targets": [...]} profiles the next N runs."""
+    err = _admin_error()
+    if err: return err
+    if request.method == "GET":
+        return {"pending": profiling.pending(), "profiles": profiling.list_profiles()}
+    body = request.get_json(silent=True) or {}
+    try:
+        pending = profiling.arm(body.get("runs", 1), body.get("targets") or profiling.TARGETS)
+    except (ValueError, TypeError) as e:
+        return {"error": str(e)}, 400
+    return {"pending": pending}, 202
+
+@app.route("/admin/profiles/<profile_id>")
+def profile_summary(profile_id):
+    """Top functions (by cumulative time) and allocation sites of one saved profile."""
+    err = _admin_error()
+    if err: return err
+    summary = profiling.load_profile(profile_id)
+    if summary is None:
+        return {"error": "Profile not found."}, 404
+    return summary
+
+@app.route("/webhooks/<sub_id>", methods=["DELETE"])
+def webhooks_remove(sub_id):
+    err = _admin_error()
+    if err: return err
+    if not webhooks.remove_subscription(sub_id):
+        return {"error": "Webhook not found."}, 404
+    return {"deleted": sub_id}
+
+# ---- /bulk ----
+
+def _ensure_file(path, ttl, refresh):
+    """Apply the route caching policy to a storage file (refresh when stale, always in debug)."""
+    if shared:
+        return os.path.exists(path)
+    if debug:
+        refresh()
+    index = 0
+    while index != 3:
+        if _cache_hit(path, ttl) or not _refresh(path, refresh):
+            return True
+        index += 1
+    return False
+
+BULK_FILES = {
+    "fruits": ("storage/fruits.json", 7200, lambda: write_file("storage/fruits.json", get_fruits())),
+    "stock": ("storage/stock.json", 600, refresh_stock),
+}
+BULK_SECTIONS = ("gamepasses", "specials")   # parts of the merged /all document
+
+def _section_fragment(snap, name):
+    return snap.derived(f"fragment:{name}", lambda s: serializer.dumps(s.data.get(name)))
+
+@app.route("/bulk")
+def bulk():
+    names = [n.strip() for n in request.args.get("datasets", "").split(",") if n.strip()]
+    known = set(BULK_FILES) | set(BULK_SECTIONS) | {"all", "info"}
+    unknown = [n for n in names if n not in known]
+    if not names or unknown:
+        return {"error": f"'datasets' must be a comma separated subset of {sorted(known)}."}, 400
+
+    parts = []
+    snap = None
+    for name in dict.fromkeys(names):
+        if name in BULK_FILES:
+            path, ttl, refresh = BULK_FILES[name]
+            sig, frag = file_fragment(path) if _ensure_file(path, ttl, refresh) else (None, None)
+            parts.append((name, sig, frag))
+            continue
+        if name == "info":
+            cat = catalog()
+            parts.append((name, cat.etag, cat.body))
+            continue
+        snap = snap or _all_snapshot()
+        if snap is None:
+            parts.append((name, None, None))
+        elif name == "all":
+            parts.append((name, snap.generation, snap.body))
+        else:
+            parts.append((name, snap.generation, _section_fragment(snap, name)))
+
+    if any(frag is None for _, _, frag in parts):
+        return {"error": "Failed to fetch data after multiple attempts."}, 500
+    want_gzip = ("gzip" in request.headers.get("Accept-Encoding", "")
+                 and negotiate(request.accept_mimetypes, request.args.get("format")) == JSON_TYPE)
+    body, gzipped = compose(parts, want_gzip)
+    resp = Response(body, mimetype="application/json")
+    resp.vary.add("Accept-Encoding")
+    if gzipped:
+        resp.headers["Content-Encoding"] = "gzip"
+    return resp
+
+@app.route("/all/diff")
+def all_diff():
+    since = request.args.get("since", "")
+    snap = _all_snapshot()
+    if snap is None:
+        return {"error": "Failed to fetch data after multiple attempts."}, 500
+    ops = delta_since(snap, since)
+    if ops is None:
+        return {"error": "Unknown or expired generation; fetch /all again.", "generation": snap.generation}, 410
+    resp = app.json.response({"since": since, "generation": snap.generation, "patch": ops})
+    resp.headers["X-Snapshot-Generation"] = snap.generation
+    return resp
+
+# ---- FAST_START: ready immediately, refresh in the background ----
+
+def _warm_up():
+    """Refresh every stale dataset once while routes keep serving the last good files."""
+    jobs = list(BULK_FILES.values()) + [("storage/all.json", 600, get_all)]
+    try:
+        for path, ttl, refresh in jobs:
+            if not cadence_for(path, ttl).fresh():
+                try:
+                    refresh()
+                except Exception as e:
+                    print(f"Warm-up refresh of {path} failed: {e}")
+    finally:
+        _warming.clear()
+
+if fast_start and not shared and not debug:
+    current_snapshot()  # load the last good all.json before the first request
+    _warming.set()
+    threading.Thread(target=_warm_up, name="warm-up", daemon=True).start()
+
+# ---- rotation-aligned stock refresh (src/stock_schedule.py) ----
+
+def _publish_stock(snap):
+    stock_feed.publish(write_stock(snap))
+
+stock_scheduler = StockScheduler(fetch_stock, _publish_stock, lambda: read_file("storage/stock.json"))
+
+if stock_scheduling and not shared and not debug:
+    stock_scheduler.start()
@@ -0,0 +1,124 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional
+
+try:
+    import msgpack
+except ImportError:  # optional
+    msgpack = None
+try:
+    import cbor2
+except ImportError:  # optional
+    cbor2 = None
+
+from .serializer import dumps, loads
+
+# -----------------------------------------------------------------------------
+# Binary response formats (MessagePack / CBOR) and the columnar layout
+# -----------------------------------------------------------------------------
+
+JSON_TYPE = "application/json"
+MSGPACK_TYPE = "application/msgpack"
+CBOR_TYPE = "application/cbor"
+
+ENCODERS: Dict[str, Callable[[Any], bytes]] = {}
+if msgpack is not None:
+    ENCODERS[MSGPACK_TYPE] = lambda obj: msgpack.packb(obj, use_bin_type=True)
+if cbor2 is not None:
+    ENCODERS[CBOR_TYPE] = cbor2.dumps
+
+# ?format= shortcuts and the legacy/alternative media type names
+FORMAT_ALIASES = {
+    "json": JSON_TYPE,
+    "msgpack": MSGPACK_TYPE, "application/x-msgpack": MSGPACK_TYPE, "application/vnd.msgpack": MSGPACK_TYPE,
+    "cbor": CBOR_TYPE,
+}
+
+def negotiate(accept_mimetypes, format_arg: Optional[str]) -> str:
+    """
+    Pick the response media type: an explicit ?format= wins, then the Accept header.
+    Anything unknown or unavailable falls back to JSON.
+    """
+    if format_arg:
+        mt = FORMAT_ALIASES.get(format_arg.lower(), format_arg.lower())
+        return mt if mt in ENCODERS else JSON_TYPE
+    offered = [JSON_TYPE] + list(ENCODERS) + [a for a, mt in FORMAT_ALIASES.items() if "/" in a and mt in ENCODERS]
+    best = accept_mimetypes.best_match(offered, default=JSON_TYPE)
+    return FORMAT_ALIASES.get(best, best)
+
+# ---- encoded-body cache for responses that are not tied to a snapshot ----
+
+_encoded: "OrderedDict[tuple, bytes]" = OrderedDict()
+_encoded_lock = threading.Lock()
+ENCODED_CACHE_SIZE = 256
+
+def encode_json_body(body: bytes, mimetype: str) -> bytes:
+    """Re-encode a JSON response body, memoized by content hash (each distinct body is encoded once)."""
+    key = (hashlib.sha1(body).digest(), mimetype)
+    with _encoded_lock:
+        hit = _encoded.get(key)
+        if hit is not None:
+            _encoded.move_to_end(key)
+            return hit
+    out = ENCODERS[mimetype](loads(body))
+    with _encoded_lock:
+        _encoded[key] = out
+        while len(_encoded) > ENCODED_CACHE_SIZE:
+            _encoded.popitem(last=False)
+    return out
+
+LAYOUTS = ("", "columnar")   # ?layout= values; anything else is served as the plain document
+_SHORT_NAMES = {JSON_TYPE: "json", MSGPACK_TYPE: "msgpack", CBOR_TYPE: "cbor"}
+
+def variant_etag(generation: str, mimetype: str, layout: str = "") -> str:
+    """ETag of one encoding of a document (snapshot generation, catalog etag); plain JSON keeps the bare tag."""
+    if mimetype == JSON_TYPE and not layout:
+        return generation
+    return ".".join(p for p in (generation, _SHORT_NAMES.get(mimetype, mimetype), layout) if p)
+
+def encode_snapshot(snapshot, mimetype: str, layout: str = "") -> bytes:
+    """Encode the snapshot document once per (media type, layout) and keep it with the snapshot."""
+    if layout not in LAYOUTS or (mimetype != JSON_TYPE and mimetype not in ENCODERS):
+        raise ValueError(f"unknown layout {layout!r} or media type {mimetype!r}")
+
+    def build(s):
+        doc = columnar_document(s) if layout == "columnar" else s.data
+        if mimetype == JSON_TYPE:
+            return dumps(doc)
+        return ENCODERS[mimetype](doc)
+    return snapshot.derived(f"encoded:{mimetype}:{layout}", build)
+
+# ---- columnar layout ----
+
+def _column(values: List[Any]):
+    """Dictionary-code string columns with many repeats; keep everything else as a plain list."""
+    if values and all(isinstance(v, str) for v in values):
+        uniq = list(dict.fromkeys(values))
+        if len(uniq) * 2 <= len(values):
+            pos = {v: i for i, v in enumerate(uniq)}
+            return {"dict": uniq, "codes": [pos[v] for v in values]}
+    return values
+
+def columns(rows: List[Dict[str, Any]], skip=()) -> Dict[str, Any]:
+    keys = list(dict.fromkeys(k for r in rows for k in r if k not in skip))
+    return {"rows": len(rows), "columns": {k: _column([r.get(k) for r in rows]) for k in keys}}
+
+def columnar_document(snapshot) -> Dict[str, Any]:
+    """
+    /all with fruits and skins as column tables. Skins are flattened into one table whose
+    `fruit` column holds the row number of their fruit in the fruits table.
+    """
+    def build(s):
+        data = s.data
+        fruits = data.get("fruits") or []
+        skins = []
+        for i, f in enumerate(fruits):
+            for sk in (f.get("skins") or []):
+                skins.append(dict(sk, fruit=i))
+        doc = dict(data)
+        doc["fruits"] = columns(fruits, skip=("skins",))
+        doc["skins"] = columns(skins)
+        doc["gamepasses"] = columns(data.get("gamepasses") or [])
+        return doc
+    return snapshot.derived("columnar", build)
@@ -0,0 +1,64 @@
+import gzip
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from .serializer import dumps, loads
+
+# -----------------------------------------------------------------------------
+# Pre-serialized JSON fragments, composed into responses without re-encoding
+# -----------------------------------------------------------------------------
+
+_files: Dict[str, Tuple[Tuple[int, int], bytes]] = {}
+_composed: "OrderedDict[Tuple, Tuple[bytes, Optional[bytes]]]" = OrderedDict()
+_composed_lock = threading.Lock()
+COMPOSED_CACHE_SIZE = 32
+
+def file_fragment(path: str) -> Tuple[Optional[Tuple[int, int]], Optional[bytes]]:
+    """
+    Return (signature, bytes) of a storage JSON file, re-read only when it changes.
+    The content is validated once per change so a half-written file is never embedded.
+    """
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None, None
+    sig = (st.st_mtime_ns, st.st_size)
+    hit = _files.get(path)
+    if hit and hit[0] == sig:
+        return hit
+    try:
+        with open(path, "rb") as f:
+            body = f.read()
+        loads(body)
+    except (OSError, ValueError) as e:
+        print(f"Error reading fragment {path}: {e}")
+        return (hit[0], hit[1]) if hit else (None, None)
+    _files[path] = (sig, body)
+    return sig, body
+
+def compose(parts: List[Tuple[str, Tuple, Optional[bytes]]], want_gzip: bool) -> Tuple[bytes, bool]:
+    """
+    Join (name, signature, fragment) parts into one JSON object.
+    The result (and its gzip form, computed once) is cached by the parts' signatures.
+    Returns (body, gzipped).
+    """
+    key = tuple((name, sig) for name, sig, _ in parts)
+    with _composed_lock:
+        hit = _composed.get(key)
+        if hit is not None:
+            _composed.move_to_end(key)
+    if hit is None:
+        body = b"{" + b",".join(
+            dumps(name) + b":" + (frag if frag is not None else b"null")
+            for name, _, frag in parts
+        ) + b"}"
+        hit = (body, None)
+    if want_gzip and hit[1] is None:
+        hit = (hit[0], gzip.compress(hit[0], compresslevel=6))
+    with _composed_lock:
+        _composed[key] = hit
+        while len(_composed) > COMPOSED_CACHE_SIZE:
+            _composed.popitem(last=False)
+    return (hit[1], True) if want_gzip else (hit[0], False)
@@ -8,6 +8,9 @@ import requests
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
 
+from .metrics import span
+from . import recording
+
 URL = "https://bloxfruitsvalues.com/api/v1/values?sortBy=position&limit=100&page=1"
 
 USER_AGENT = (
@@ -45,7 +48,7 @@ def fetch_values(session: Optional[requests.Session] = None):
         session = make_session()
         close = True
     try:
-        resp = session.get(URL, headers=HEADERS, timeout=20)
+        resp = recording.get("bfv", URL, session=session, headers=HEADERS, timeout=20)
         if resp.status_code >= 400:
             try:
                 msg = json.dumps(resp.json(), indent=2, ensure_ascii=False)
@@ -94,10 +97,12 @@ def partition_items(items: list[dict]) -> dict:
 
 def get_fruits():
     try:
-        data = fetch_values()
+        with span("fetch", "bfv"):
+            data = fetch_values()
         if not isinstance(data, dict) or "items" not in data:
             raise RuntimeError("Unexpected response shape; no 'items' key present.")
-        payload = partition_items(data["items"])
+        with span("parse", "bfv"):
+            payload = partition_items(data["items"])
 
         # os.makedirs("storage", exist_ok=True)
         # with open("storage/fruits_bfv.json", "w", encoding="utf-8") as f:
@@ -118,9 +123,10 @@ def get_fruits():
         #     ensure_ascii=False,
         # ))
 
+    # never exit the (web) process: report and let the caller's circuit breaker decide
     except requests.HTTPError as e:
-        print(f"[HTTP ERROR] {e}", file=sys.stderr); sys.exit(2)
+        print(f"[HTTP ERROR] {e}", file=sys.stderr); raise
     except requests.RequestException as e:
-        print(f"[REQUEST ERROR] {e}", file=sys.stderr); sys.exit(3)
+        print(f"[REQUEST ERROR] {e}", file=sys.stderr); raise
     except Exception as e:
-        print(f"[UNEXPECTED ERROR] {e}", file=sys.stderr); sys.exit(1)
+        print(f"[UNEXPECTED ERROR] {e}", file=sys.stderr); raise
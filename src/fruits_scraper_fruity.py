@@ -1,8 +1,10 @@
 import re
-import requests
 from bs4 import BeautifulSoup
 from typing import Dict, List, Any
 
+from .metrics import span
+from . import recording
+
 URL_VALUES = "https://fruityblox.com/blox-fruits-value-list/"
 
 VALUES_CARD_SELECTOR = "div.p-4.border.border-secondary.rounded-lg"
@@ -11,9 +13,11 @@ VALUE_RE = re.compile(r"\b(\d+(?:\.\d+)?)\s*([kmbKMB])\b")
 SUFFIX_MULTIPLIERS = {"k": 1_000, "m": 1_000_000, "b": 1_000_000_000}
 
 def fetch_soup(url: str) -> BeautifulSoup:
-    resp = requests.get(url, timeout=20)
-    resp.raise_for_status()
-    return BeautifulSoup(resp.content, "html.parser")
+    with span("fetch", "fruity"):
+        resp = recording.get("fruity", url, timeout=20)
+        resp.raise_for_status()
+    with span("parse", "fruity"):
+        return BeautifulSoup(resp.content, "html.parser")
 
 def normalize_whitespace(s: str) -> str:
     return re.sub(r"\s+", " ", s).strip()
@@ -97,7 +101,10 @@ def get_fruits() -> Dict[str, Any]:
     soup = fetch_soup(URL_VALUES)
     buckets = {"fruits": [], "gamepasses": [], "special": [], "skins": []}
 
-    for category, name, values in extract_value_cards(soup):
+    with span("parse", "fruity"):
+        cards = extract_value_cards(soup)
+
+    for category, name, values in cards:
         name = clean_name(name, category)
         item = {"name": name, "values": values}
 
@@ -0,0 +1,251 @@
+import hashlib
+import io
+import os
+import re
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, Optional, Set
+from urllib.parse import urljoin
+
+try:
+    from PIL import Image
+except ImportError:  # optional: no thumbnails without Pillow
+    Image = None
+
+from .manager import read_file, write_file
+from . import metrics
+
+# -----------------------------------------------------------------------------
+# Local image cache: content-addressed files under storage/images, served at /img/<hash>
+# -----------------------------------------------------------------------------
+
+IMAGE_DIR = "storage/images"
+INDEX_FILE = os.path.join(IMAGE_DIR, "index.json")   # source URL -> content hash
+ENABLED = os.environ.get("IMAGE_CACHE", "True").lower() in ("true", "1", "t")
+SOURCE_BASE = os.environ.get("IMAGE_SOURCE_BASE", "https://fruityblox.com/")   # base of relative image paths
+PUBLIC_PREFIX = os.environ.get("IMAGE_PUBLIC_PREFIX", "/img/")                 # what image fields are rewritten to
+WORKERS = int(os.environ.get("IMAGE_WORKERS", "4"))
+MAX_IMAGE_BYTES = int(os.environ.get("IMAGE_MAX_BYTES", str(5 * 1024 * 1024)))
+MAX_CACHE_BYTES = int(os.environ.get("IMAGE_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+THUMB_SIZES = tuple(int(s) for s in os.environ.get("IMAGE_THUMB_SIZES", "64,128").split(",") if s.strip())
+TOUCH_INTERVAL = 3600   # serving a file refreshes its mtime (the LRU clock) at most this often
+TIMEOUT = 20
+
+IMAGE_FIELDS = ("image", "ingame_image")
+HASH_RE = re.compile(r"^[0-9a-f]{40}$")
+
+# only raster images are cached: an SVG served from the API origin could run script
+CACHEABLE_TYPES = ("image/png", "image/jpeg", "image/gif", "image/webp")
+
+IMAGE_FETCHES = metrics.Counter("image_fetches_total",
+                                "Image downloads by result (ok/error/too_large/unsupported).", ("result",))
+
+_SIGNATURES = (
+    (b"\x89PNG\r\n\x1a\n", "image/png"),
+    (b"\xff\xd8\xff", "image/jpeg"),
+    (b"GIF87a", "image/gif"),
+    (b"GIF89a", "image/gif"),
+)
+
+def sniff_type(head: bytes) -> str:
+    """Media type of an image from its first bytes."""
+    for magic, mimetype in _SIGNATURES:
+        if head.startswith(magic):
+            return mimetype
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "image/webp"
+    if b"<svg" in head[:512]:
+        return "image/svg+xml"
+    return "application/octet-stream"
+
+def image_path(digest: str, size: Optional[int] = None) -> str:
+    return os.path.join(IMAGE_DIR, digest if size is None else f"{digest}-{size}")
+
+class ImageCache:
+    """
+    URL -> content hash index plus the files. Downloads run on a bounded thread pool
+    and never block a refresh: rewrite() points the fields it already has at /img/ and
+    queues the rest, which the next refresh picks up.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._index: Optional[Dict[str, str]] = None
+        self._pending: Set[str] = set()
+        self._pool: Optional[ThreadPoolExecutor] = None
+
+    def index(self) -> Dict[str, str]:
+        if self._index is None:
+            stored = read_file(INDEX_FILE) if os.path.exists(INDEX_FILE) else {}
+            self._index = stored if isinstance(stored, dict) else {}
+        return self._index
+
+    def lookup(self, url: str) -> Optional[str]:
+        digest = self.index().get(url)
+        if digest is not None and os.path.exists(image_path(digest)):
+            return digest
+        return None
+
+    # ---- downloads ----
+
+    def fetch(self, urls: Iterable[str]) -> None:
+        """Queue downloads of the URLs that are neither cached nor already queued."""
+        with self._lock:
+            todo = [u for u in urls if u not in self._pending and self.lookup(u) is None]
+            if not todo:
+                return
+            self._pending.update(todo)
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(max_workers=WORKERS, thread_name_prefix="images")
+        for url in todo:
+            self._pool.submit(self._download, url)
+
+    def _download(self, url: str) -> None:
+        from . import recording   # imports requests, kept off the startup path
+
+        try:
+            resp = recording.get("images", url, timeout=TIMEOUT, stream=True)
+            resp.raise_for_status()
+            body = b""
+            for chunk in resp.iter_content(64 * 1024):
+                body += chunk
+                if len(body) > MAX_IMAGE_BYTES:
+                    break
+            resp.close()
+            if len(body) > MAX_IMAGE_BYTES:
+                IMAGE_FETCHES.inc("too_large")
+                print(f"Image {url} is larger than {MAX_IMAGE_BYTES} bytes, not cached")
+                return
+            if sniff_type(body[:512]) not in CACHEABLE_TYPES:
+                IMAGE_FETCHES.inc("unsupported")
+                print(f"Image {url} is not a raster image, not cached")
+                return
+            recording.record("images", url, resp, body)
+            digest = self.store(body)
+            with self._lock:
+                self.index()[url] = digest
+                write_file(INDEX_FILE, self._index)
+            IMAGE_FETCHES.inc("ok")
+        except Exception as e:
+            IMAGE_FETCHES.inc("error")
+            print(f"Image {url} failed: {e}")
+        finally:
+            with self._lock:
+                self._pending.discard(url)
+        self.evict()
+
+    def store(self, body: bytes) -> str:
+        """Write an image and its thumbnails under its content hash; return the hash."""
+        digest = hashlib.sha1(body).hexdigest()
+        path = image_path(digest)
+        if not os.path.exists(path):
+            os.makedirs(IMAGE_DIR, exist_ok=True)
+            _write_atomic(path, body)
+            for size in THUMB_SIZES:
+                thumb = _thumbnail(body, size)
+                if thumb is not None:
+                    _write_atomic(image_path(digest, size), thumb)
+        return digest
+
+    def evict(self) -> None:
+        """
+        Delete least recently used images (by mtime) until the cache fits MAX_CACHE_BYTES,
+        and drop the index entries of the images that are gone.
+        """
+        try:
+            entries = [e for e in os.scandir(IMAGE_DIR)
+                       if e.is_file() and e.name != "index.json" and not e.name.startswith(".")]
+        except FileNotFoundError:
+            return
+        stats = [(e.stat().st_mtime, e.stat().st_size, e.path) for e in entries]
+        total = sum(size for _, size, _ in stats)
+        if total <= MAX_CACHE_BYTES:
+            return
+        for _, size, path in sorted(stats):
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            if total <= MAX_CACHE_BYTES:
+                break
+        with self._lock:
+            index = self.index()
+            gone = [url for url, digest in index.items() if not os.path.exists(image_path(digest))]
+            for url in gone:
+                del index[url]
+            if gone:
+                write_file(INDEX_FILE, index)
+
+    # ---- rewriting ----
+
+    def rewrite(self, doc):
+        """
+        Copy of `doc` with every cached image/ingame_image URL replaced by its /img/ path.
+        URLs not cached yet are queued for download and left as they are.
+        """
+        if not ENABLED:
+            return doc
+        missing: Set[str] = set()
+        out = self._rewrite(doc, missing)
+        if missing:
+            self.fetch(missing)
+        return out
+
+    def _rewrite(self, obj, missing: Set[str]):
+        if isinstance(obj, list):
+            return [self._rewrite(v, missing) for v in obj]
+        if not isinstance(obj, dict):
+            return obj
+        out = {}
+        for k, v in obj.items():
+            if k in IMAGE_FIELDS and isinstance(v, str) and v and not v.startswith(PUBLIC_PREFIX):
+                url = urljoin(SOURCE_BASE, v)
+                digest = self.lookup(url)
+                if digest is None:
+                    missing.add(url)
+                    v = url   # absolute, so clients don't resolve it against this API
+                else:
+                    v = PUBLIC_PREFIX + digest
+                out[k] = v
+            else:
+                out[k] = self._rewrite(v, missing)
+        return out
+
+def _write_atomic(path: str, body: bytes) -> None:
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(body)
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        raise
+
+def _thumbnail(body: bytes, size: int) -> Optional[bytes]:
+    """WebP thumbnail fitting size x size, or None without Pillow or for images it can't read."""
+    if Image is None:
+        return None
+    try:
+        with Image.open(io.BytesIO(body)) as im:
+            im.thumbnail((size, size))
+            out = io.BytesIO()
+            im.save(out, "WEBP")
+            return out.getvalue()
+    except Exception:
+        return None
+
+def touch(path: str) -> None:
+    """Mark a served file as recently used."""
+    try:
+        if time.time() - os.path.getmtime(path) > TOUCH_INTERVAL:
+            os.utime(path)
+    except OSError:
+        pass
+
+image_cache = ImageCache()
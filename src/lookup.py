@@ -0,0 +1,64 @@
+from typing import Any, Dict, Optional, Tuple
+
+from .names import fruit_key, skin_key, gamepass_key
+from .snapshot import Snapshot
+from .serializer import dumps
+
+# -----------------------------------------------------------------------------
+# Per-entity lookups over a snapshot
+# -----------------------------------------------------------------------------
+
+class EntityIndex:
+    """
+    Hash index of the merged fruits, skins and gamepasses of one snapshot,
+    keyed the same way the merge in all.py keys them.
+    Encoded responses are cached per entity, so repeated lookups are a dict hit.
+    """
+
+    def __init__(self, data: Dict[str, Any]):
+        self.fruits: Dict[str, Dict[str, Any]] = {}
+        self.skins: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        self.gamepasses: Dict[str, Dict[str, Any]] = {}
+        self._encoded: Dict[Tuple[str, Any], bytes] = {}
+
+        for f in (data.get("fruits") or []):
+            name = f.get("name")
+            if not name: continue
+            fkey = fruit_key(name)
+            self.fruits.setdefault(fkey, f)
+            for s in (f.get("skins") or []):
+                sname = s.get("name")
+                if not sname: continue
+                skin = dict(s)
+                skin["fruit"] = name
+                self.skins.setdefault((fkey, skin_key(sname)), skin)
+
+        for g in (data.get("gamepasses") or []):
+            name = g.get("name")
+            if not name: continue
+            self.gamepasses.setdefault(gamepass_key(name), g)
+
+    def _encode(self, key: Tuple[str, Any], record: Optional[Dict[str, Any]]) -> Optional[bytes]:
+        if record is None:
+            return None
+        body = self._encoded.get(key)
+        if body is None:
+            body = dumps(record)
+            self._encoded[key] = body
+        return body
+
+    def fruit(self, name: str) -> Optional[bytes]:
+        k = fruit_key(name)
+        return self._encode(("fruit", k), self.fruits.get(k))
+
+    def skin(self, fruit: str, skin: str) -> Optional[bytes]:
+        k = (fruit_key(fruit), skin_key(skin))
+        return self._encode(("skin", k), self.skins.get(k))
+
+    def gamepass(self, name: str) -> Optional[bytes]:
+        k = gamepass_key(name)
+        return self._encode(("gamepass", k), self.gamepasses.get(k))
+
+def entity_index(snapshot: Snapshot) -> EntityIndex:
+    """Return the (lazily built) entity index of a snapshot."""
+    return snapshot.derived("entity_index", lambda s: EntityIndex(s.data))
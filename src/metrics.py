@@ -0,0 +1,129 @@
+import bisect
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Sequence, Tuple
+
+# -----------------------------------------------------------------------------
+# Minimal Prometheus-style metrics (text exposition format 0.0.4)
+# -----------------------------------------------------------------------------
+
+log = logging.getLogger("bloxfruits.refresh")
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+STAGE_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 60)
+
+_registry: List["_Metric"] = []
+
+def _fmt_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{n}="{str(v)}"'.replace("\n", " ") for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()):
+        self.name, self.help, self.labels = name, help, tuple(labels)
+        self._lock = threading.Lock()
+        _registry.append(self)
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name, help, labels=()):
+        super().__init__(name, help, labels)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, *labels: str, by: float = 1) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + by
+
+    def render(self) -> List[str]:
+        return self.header() + [f"{self.name}{_fmt_labels(self.labels, k)} {v}" for k, v in sorted(self._values.items())]
+
+class Gauge(_Metric):
+    """
+    Gauge whose value is read from a callback at scrape time. With labels the callback
+    returns {label values tuple: value}.
+    """
+    kind = "gauge"
+
+    def __init__(self, name, help, fn: Callable[[], float], labels=()):
+        super().__init__(name, help, labels)
+        self.fn = fn
+
+    def render(self) -> List[str]:
+        try:
+            values = self.fn() if self.labels else {(): self.fn()}
+            values = {k: float(v) for k, v in values.items()}
+        except Exception:
+            return []
+        return self.header() + [f"{self.name}{_fmt_labels(self.labels, k)} {v}" for k, v in sorted(values.items())]
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, help, labels=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, help, labels)
+        self.buckets = tuple(buckets)
+        self._series: Dict[Tuple[str, ...], list] = {}   # labels -> [bucket counts..., sum, count]
+
+    def observe(self, value: float, *labels: str) -> None:
+        i = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            s = self._series.get(labels)
+            if s is None:
+                s = self._series[labels] = [0] * (len(self.buckets) + 2)
+            if i < len(self.buckets):
+                s[i] += 1
+            s[-2] += value
+            s[-1] += 1
+
+    def render(self) -> List[str]:
+        out = self.header()
+        with self._lock:
+            series = {k: list(v) for k, v in self._series.items()}
+        for labels, s in sorted(series.items()):
+            acc = 0
+            for b, n in zip(self.buckets, s):
+                acc += n
+                le = 'le="%s"' % b
+                out.append(f"{self.name}_bucket{_fmt_labels(self.labels, labels, le)} {acc}")
+            le = 'le="+Inf"'
+            out.append(f"{self.name}_bucket{_fmt_labels(self.labels, labels, le)} {s[-1]}")
+            out.append(f"{self.name}_sum{_fmt_labels(self.labels, labels)} {s[-2]}")
+            out.append(f"{self.name}_count{_fmt_labels(self.labels, labels)} {s[-1]}")
+        return out
+
+def render() -> str:
+    lines = []
+    for m in _registry:
+        lines.extend(m.render())
+    return "\n".join(lines) + "\n"
+
+# ---- shared metrics ----
+
+REQUEST_SECONDS = Histogram("http_request_duration_seconds", "Request latency by route.", ("route", "method", "status"))
+CACHE_REQUESTS = Counter("cache_requests_total", "Cache lookups by dataset and result (hit/miss).", ("dataset", "result"))
+STAGE_SECONDS = Histogram("refresh_stage_duration_seconds", "Refresh pipeline stage duration.", ("stage", "source"), STAGE_BUCKETS)
+STAGE_ERRORS = Counter("refresh_stage_errors_total", "Refresh pipeline stages that raised.", ("stage", "source"))
+
+@contextmanager
+def span(stage: str, source: str):
+    """Time one refresh stage (fetch/parse/normalize/merge/serialize) of one source."""
+    t = time.perf_counter()
+    try:
+        yield
+    except BaseException:
+        STAGE_ERRORS.inc(stage, source)
+        raise
+    finally:
+        elapsed = time.perf_counter() - t
+        STAGE_SECONDS.observe(elapsed, stage, source)
+        log.info("span stage=%s source=%s seconds=%.4f", stage, source, elapsed)
@@ -0,0 +1,33 @@
+import re
+
+# -----------------------------------------------------------------------------
+# Name normalization shared by the merge and the lookup endpoints
+# -----------------------------------------------------------------------------
+
+def normalize_name(name: str) -> str:
+    return re.sub(r'[^a-z]+', '', (name or '').lower())
+
+def words(name: str):
+    return re.findall(r'[a-z]+', (name or '').lower())
+
+def normalize_name_words(name: str) -> str:
+    return ''.join(sorted(words(name)))
+
+# simple alias map (extend as needed)
+FRUIT_ALIASES = {
+    normalize_name_words("Lightning"): normalize_name_words("Rumble"),
+    # normalize_name_words("Door"): normalize_name_words("Portal"),
+}
+
+def fruit_key(name: str) -> str:
+    """Canonical key of a fruit name (word-order insensitive, aliases applied)."""
+    k = normalize_name_words(name)
+    return FRUIT_ALIASES.get(k, k)
+
+def skin_key(name: str) -> str:
+    """Canonical key of a skin name, as used for the per-fruit skin maps."""
+    return normalize_name_words(name)
+
+def gamepass_key(name: str) -> str:
+    """Canonical key of a gamepass name, as used by the gamepass merge."""
+    return normalize_name(name)
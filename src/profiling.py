@@ -0,0 +1,144 @@
+import functools
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from .serializer import dump_file, load_file
+
+# -----------------------------------------------------------------------------
+# On-demand CPU (cProfile) and allocation (tracemalloc) profiles of refreshes
+# -----------------------------------------------------------------------------
+
+PROFILE_DIR = "storage/profiles"
+TARGETS = ("get_all", "get_stock_all")
+KEEP = int(os.environ.get("PROFILE_KEEP", "20"))   # profiles kept on disk
+TOP = 25                                            # rows in each summary table
+
+# target -> runs still to profile; PROFILE_RUNS=N arms every target at startup
+_pending: Dict[str, int] = {t: int(os.environ.get("PROFILE_RUNS", "0")) for t in TARGETS}
+_lock = threading.Lock()
+_active = threading.Lock()   # one profile at a time (get_all calls get_stock_all)
+
+def arm(runs: int, targets=TARGETS) -> Dict[str, int]:
+    """Profile the next `runs` calls of each target. Returns the pending counts."""
+    with _lock:
+        for t in targets:
+            if t not in _pending:
+                raise ValueError(f"Unknown profiling target: {t}")
+            _pending[t] = max(0, int(runs))
+        return dict(_pending)
+
+def pending() -> Dict[str, int]:
+    with _lock:
+        return dict(_pending)
+
+def _take(name: str) -> bool:
+    with _lock:
+        if _pending.get(name, 0) <= 0:
+            return False
+        _pending[name] -= 1
+        return True
+
+def profiled(name: str) -> Callable:
+    """Decorator: while `name` is armed, run the call under cProfile + tracemalloc and save the result."""
+    def wrap(fn):
+        @functools.wraps(fn)
+        def inner(*args, **kwargs):
+            if not _pending[name]:   # disabled: one dict lookup
+                return fn(*args, **kwargs)
+            if not _active.acquire(blocking=False):   # nested in a profiled run: already covered
+                return fn(*args, **kwargs)
+            try:
+                if not _take(name):
+                    return fn(*args, **kwargs)
+                return _run_profiled(name, fn, args, kwargs)
+            finally:
+                _active.release()
+        return inner
+    return wrap
+
+def _run_profiled(name, fn, args, kwargs):
+    import cProfile
+    import pstats
+    import tracemalloc
+
+    started_tracing = not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start(10)
+    prof = cProfile.Profile()
+    t = time.perf_counter()
+    error = None
+    try:
+        return prof.runcall(fn, *args, **kwargs)
+    except Exception as e:
+        error = repr(e)
+        raise
+    finally:
+        elapsed = time.perf_counter() - t
+        snapshot = tracemalloc.take_snapshot()
+        peak = tracemalloc.get_traced_memory()[1]
+        if started_tracing:
+            tracemalloc.stop()
+        try:
+            _save(name, prof, pstats, snapshot, elapsed, peak, error)
+        except Exception as e:
+            print(f"Error saving profile for {name}: {e}")
+
+def _save(name, prof, pstats, snapshot, elapsed, peak, error) -> None:
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    profile_id = f"{name}-{time.strftime('%Y%m%dT%H%M%S')}-{int(time.time() * 1000) % 1000:03d}"
+    prof.dump_stats(os.path.join(PROFILE_DIR, f"{profile_id}.prof"))
+
+    stats = pstats.Stats(prof).stats
+    functions = sorted(stats.items(), key=lambda kv: -kv[1][3])[:TOP]
+    allocations = snapshot.statistics("lineno")[:TOP]
+    summary = {
+        "id": profile_id,
+        "target": name,
+        "createdAt": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "seconds": round(elapsed, 4),
+        "peakMemoryBytes": peak,
+        "error": error,
+        "functions": [
+            {"function": f"{os.path.basename(file)}:{line}({func})", "calls": nc,
+             "tottime": round(tt, 6), "cumtime": round(ct, 6)}
+            for (file, line, func), (cc, nc, tt, ct, _) in functions
+        ],
+        "allocations": [
+            {"site": f"{os.path.basename(s.traceback[0].filename)}:{s.traceback[0].lineno}",
+             "bytes": s.size, "count": s.count}
+            for s in allocations
+        ],
+    }
+    dump_file(os.path.join(PROFILE_DIR, f"{profile_id}.json"), summary)
+
+    # keep the newest KEEP profiles
+    ids = sorted({os.path.splitext(n)[0] for n in os.listdir(PROFILE_DIR)}, key=lambda i: i.split("-", 1)[1])
+    for old in ids[:-KEEP]:
+        for ext in (".prof", ".json"):
+            try:
+                os.remove(os.path.join(PROFILE_DIR, old + ext))
+            except FileNotFoundError:
+                pass
+
+def list_profiles() -> List[Dict[str, Any]]:
+    """Saved profiles, newest first, without the per-function tables."""
+    try:
+        names = [n for n in os.listdir(PROFILE_DIR) if n.endswith(".json")]
+    except FileNotFoundError:
+        return []
+    out = []
+    for n in names:
+        s = load_profile(n[:-5])
+        if s:
+            out.append({k: s[k] for k in ("id", "target", "createdAt", "seconds", "peakMemoryBytes", "error")})
+    return sorted(out, key=lambda s: s["id"].split("-", 1)[1], reverse=True)
+
+def load_profile(profile_id: str) -> Optional[Dict[str, Any]]:
+    if os.path.basename(profile_id) != profile_id:
+        return None
+    try:
+        return load_file(os.path.join(PROFILE_DIR, f"{profile_id}.json"))
+    except (OSError, ValueError):
+        return None
@@ -0,0 +1,109 @@
+import hashlib
+import os
+import time
+from typing import Any, Optional
+
+import requests
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+from . import metrics
+from .serializer import dump_file, load_file
+
+# -----------------------------------------------------------------------------
+# Record/replay of upstream HTTP responses (storage/recordings/<source>/)
+# -----------------------------------------------------------------------------
+#
+# Modes, per source (HTTP_MODE_<SOURCE>) with HTTP_MODE as the default:
+#   live   - always fetch (production default)
+#   record - fetch and store every successful response
+#   replay - only serve stored responses; a missing one is an error
+#   auto   - serve the stored response when there is one, otherwise fetch and
+#            store it (default with DEBUG=true)
+#
+# Sources: fruity, bfv, stock, images, and deployment (the
+# REFRESH_BASE pings in src/all.py, which are never recorded: they only run live).
+
+RECORDINGS_DIR = "storage/recordings"
+LIVE, RECORD, REPLAY, AUTO = "live", "record", "replay", "auto"
+MODES = (LIVE, RECORD, REPLAY, AUTO)
+DEBUG = os.getenv("DEBUG", "False").lower() in ("true", "1", "t")
+DEFAULT_MODE = os.getenv("HTTP_MODE", AUTO if DEBUG else LIVE).lower()
+KEPT_HEADERS = ("Content-Type", "ETag", "Last-Modified")
+
+HTTP_RECORDINGS = metrics.Counter("http_recordings_total",
+                                  "Upstream requests by source and how they were served (live/recorded/replayed).",
+                                  ("source", "result"))
+
+class RecordingMissing(requests.ConnectionError):
+    """Replay mode and nothing recorded for the URL."""
+
+def mode_for(source: str) -> str:
+    mode = os.getenv(f"HTTP_MODE_{source.upper()}", DEFAULT_MODE).lower()
+    return mode if mode in MODES else LIVE
+
+def _paths(source: str, url: str):
+    key = hashlib.sha1(url.encode("utf-8")).hexdigest()[:20]
+    base = os.path.join(RECORDINGS_DIR, source, key)
+    return base + ".json", base + ".body"
+
+def load(source: str, url: str) -> Optional[requests.Response]:
+    """The recorded response for `url`, rebuilt as a requests.Response, or None."""
+    meta_path, body_path = _paths(source, url)
+    try:
+        meta = load_file(meta_path)
+        with open(body_path, "rb") as f:
+            body = f.read()
+    except (OSError, ValueError):
+        return None
+    resp = requests.Response()
+    resp.status_code = meta.get("status", 200)
+    resp.reason = "OK (replayed)"
+    resp.url = meta.get("url", url)
+    resp.headers = CaseInsensitiveDict(meta.get("headers") or {})
+    resp.encoding = get_encoding_from_headers(resp.headers)   # as requests decides for a live response
+    resp._content = body
+    resp._content_consumed = True
+    resp.replayed = True
+    return resp
+
+def save(source: str, url: str, resp: requests.Response, body: bytes) -> None:
+    meta_path, body_path = _paths(source, url)
+    os.makedirs(os.path.dirname(meta_path), exist_ok=True)
+    meta = {
+        "url": url,
+        "status": resp.status_code,
+        "headers": {h: resp.headers[h] for h in KEPT_HEADERS if h in resp.headers},
+        "recordedAt": int(time.time()),
+    }
+    with open(body_path, "wb") as f:
+        f.write(body)
+    dump_file(meta_path, meta)
+
+def get(source: str, url: str, session: Optional[requests.Session] = None, **kwargs: Any) -> requests.Response:
+    """
+    requests.get (or session.get) under the source's record/replay mode. A streamed
+    (stream=True) live response is recorded by the caller with record() once it has read it.
+    """
+    mode = mode_for(source)
+    if mode in (REPLAY, AUTO):
+        recorded = load(source, url)
+        if recorded is not None:
+            HTTP_RECORDINGS.inc(source, "replayed")
+            return recorded
+        if mode == REPLAY:
+            raise RecordingMissing(f"No recording of {url} for {source} (HTTP_MODE_{source.upper()}=replay)")
+    resp = (session or requests).get(url, **kwargs)
+    if not kwargs.get("stream"):
+        record(source, url, resp)
+    return resp
+
+def record(source: str, url: str, resp: requests.Response, body: Optional[bytes] = None) -> None:
+    """Count a live response and store it when the source records; `body` is what was read of a streamed one."""
+    if getattr(resp, "replayed", False):
+        return
+    if mode_for(source) in (RECORD, AUTO) and resp.status_code < 400:
+        save(source, url, resp, resp.content if body is None else body)
+        HTTP_RECORDINGS.inc(source, "recorded")
+    else:
+        HTTP_RECORDINGS.inc(source, "live")
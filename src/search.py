@@ -0,0 +1,113 @@
+import bisect
+import re
+from collections import defaultdict
+from typing import Any, Dict, List, Tuple
+
+from .snapshot import Snapshot
+
+# -----------------------------------------------------------------------------
+# Typo-tolerant search over fruits, skins and gamepasses
+# -----------------------------------------------------------------------------
+
+MIN_SCORE = 0.2
+
+def _tokens(text: str) -> List[str]:
+    return re.findall(r'[a-z0-9]+', (text or '').lower())
+
+def _trigrams(tokens) -> set:
+    """pg_trgm style trigrams: every word is padded with two leading and one trailing blank."""
+    grams = set()
+    for tok in tokens:
+        padded = f"  {tok} "
+        for i in range(len(padded) - 2):
+            grams.add(padded[i:i + 3])
+    return grams
+
+class SearchIndex:
+    """
+    Trigram index built once per snapshot.
+
+    Fuzzy matching scores documents by trigram similarity (shared / union), which
+    tolerates typos ("leperd") and word order ("drgon ember"). Autocomplete uses a
+    sorted list of every word-suffix of every name, so prefixes resolve by bisection.
+    """
+
+    def __init__(self, data: Dict[str, Any]):
+        self.docs: List[Dict[str, Any]] = []
+        self._grams: List[int] = []                       # doc id -> trigram count
+        self._postings: Dict[str, List[int]] = defaultdict(list)
+        self._prefixes: List[Tuple[str, int, int]] = []   # (lowercase name suffix, word offset, doc id)
+
+        for f in (data.get("fruits") or []):
+            fname = f.get("name")
+            if not fname: continue
+            self._add({"type": "fruit", "name": fname}, fname)
+            for s in (f.get("skins") or []):
+                sname = s.get("name")
+                if not sname: continue
+                self._add({"type": "skin", "name": sname, "fruit": fname}, f"{sname} {fname}")
+        for g in (data.get("gamepasses") or []):
+            gname = g.get("name")
+            if not gname: continue
+            self._add({"type": "gamepass", "name": gname}, gname)
+
+        self._prefixes.sort()
+        self._prefix_keys = [p for p, _, _ in self._prefixes]
+
+    def _add(self, doc: Dict[str, Any], text: str) -> None:
+        doc_id = len(self.docs)
+        self.docs.append(doc)
+        toks = _tokens(text)
+        grams = _trigrams(toks)
+        self._grams.append(len(grams))
+        for g in grams:
+            self._postings[g].append(doc_id)
+        for i in range(len(toks)):
+            self._prefixes.append((" ".join(toks[i:]), i, doc_id))
+
+    def autocomplete(self, q: str, limit: int = 10) -> List[Dict[str, Any]]:
+        prefix = " ".join(_tokens(q))
+        if not prefix:
+            return []
+        best = {}
+        i = bisect.bisect_left(self._prefix_keys, prefix)
+        while i < len(self._prefixes) and self._prefix_keys[i].startswith(prefix):
+            _, offset, doc_id = self._prefixes[i]
+            best[doc_id] = min(best.get(doc_id, offset), offset)
+            i += 1
+        # matches at the start of a name first, then shortest completions
+        out = sorted(best, key=lambda d: (best[d], len(self.docs[d]["name"]), self.docs[d]["name"]))
+        return [dict(self.docs[d], score=1.0) for d in out[:limit]]
+
+    def search(self, q: str, limit: int = 10) -> List[Dict[str, Any]]:
+        toks = _tokens(q)
+        qgrams = _trigrams(toks)
+        if not qgrams:
+            return []
+
+        shared = defaultdict(int)
+        for g in qgrams:
+            for doc_id in self._postings.get(g, ()):
+                shared[doc_id] += 1
+
+        scores = {}
+        for doc_id, n in shared.items():
+            score = n / (len(qgrams) + self._grams[doc_id] - n)
+            if score >= MIN_SCORE:
+                scores[doc_id] = score
+
+        # prefix hits always rank above fuzzy ones
+        prefix = " ".join(toks)
+        i = bisect.bisect_left(self._prefix_keys, prefix)
+        while i < len(self._prefixes) and self._prefix_keys[i].startswith(prefix):
+            _, offset, doc_id = self._prefixes[i]
+            hit = 1.0 if self._prefix_keys[i] == prefix else 0.9
+            scores[doc_id] = max(scores.get(doc_id, 0.0), hit - 0.05 * offset)
+            i += 1
+
+        ranked = sorted(scores.items(), key=lambda kv: (-kv[1], self.docs[kv[0]]["name"]))
+        return [dict(self.docs[d], score=round(sc, 3)) for d, sc in ranked[:limit]]
+
+def search_index(snapshot: Snapshot) -> SearchIndex:
+    """Return the (lazily built) search index of a snapshot."""
+    return snapshot.derived("search_index", lambda s: SearchIndex(s.data))
@@ -0,0 +1,55 @@
+import json
+import os
+from collections.abc import Mapping
+from typing import Any, Callable, Optional, Union
+
+try:
+    import orjson
+except ImportError:  # optional: falls back to the stdlib encoder
+    orjson = None
+
+# -----------------------------------------------------------------------------
+# JSON encoding for storage files and response bodies
+# -----------------------------------------------------------------------------
+
+# JSON_BACKEND=json forces the stdlib encoder even with orjson installed
+BACKEND = "orjson" if orjson is not None and os.environ.get("JSON_BACKEND", "orjson") != "json" else "json"
+PRETTY = os.environ.get("JSON_PRETTY", "False").lower() in ("true", "1", "t")   # indent storage files
+
+def _fallback(extra: Optional[Callable[[Any], Any]]) -> Callable[[Any], Any]:
+    def default(obj):
+        if isinstance(obj, Mapping):  # frozen catalog records (MappingProxyType)
+            return dict(obj)
+        if extra is not None:
+            return extra(obj)
+        raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+    return default
+
+def dumps(obj: Any, pretty: bool = False, sort_keys: bool = False,
+          default: Optional[Callable[[Any], Any]] = None) -> bytes:
+    """UTF-8 JSON bytes, compact unless `pretty` (2-space indent)."""
+    if BACKEND == "orjson":
+        option = orjson.OPT_NON_STR_KEYS
+        if pretty:
+            option |= orjson.OPT_INDENT_2
+        if sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        return orjson.dumps(obj, default=_fallback(default), option=option)
+    return json.dumps(obj, ensure_ascii=False, sort_keys=sort_keys, default=_fallback(default),
+                      indent=2 if pretty else None, separators=None if pretty else (",", ":")).encode("utf-8")
+
+def loads(data: Union[bytes, bytearray, memoryview, str]) -> Any:
+    """Parse JSON; errors are json.JSONDecodeError with either backend."""
+    if BACKEND == "orjson":
+        return orjson.loads(data)
+    return json.loads(bytes(data) if isinstance(data, memoryview) else data)
+
+def dump_file(path: str, obj: Any, pretty: Optional[bool] = None) -> None:
+    """Write `obj` to `path`, pretty-printed only when asked to (or with JSON_PRETTY)."""
+    body = dumps(obj, pretty=PRETTY if pretty is None else pretty)
+    with open(path, "wb") as f:
+        f.write(body)
+
+def load_file(path: str) -> Any:
+    with open(path, "rb") as f:
+        return loads(f.read())
@@ -0,0 +1,219 @@
+import hashlib
+import json
+import mmap
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Union
+
+from .serializer import loads
+
+# -----------------------------------------------------------------------------
+# In-memory view of storage/all.json
+#
+# Two modes:
+#   - default: each process watches storage/all.json and reloads it on change.
+#   - shared (SNAPSHOT_MODE=shared): a single refresher process publishes
+#     immutable storage/snapshots/all-<generation>.json files and bumps
+#     storage/snapshots/CURRENT; worker processes mmap the current generation, so
+#     N workers share one copy of the serialized document through the page cache.
+# -----------------------------------------------------------------------------
+
+ALL_FILE = os.path.join("storage", "all.json")
+SHARED_DIR = os.path.join("storage", "snapshots")
+SHARED_CURRENT = os.path.join(SHARED_DIR, "CURRENT")
+SHARED_KEEP = 3   # published generations kept on disk (workers may still map older ones)
+
+SHARED = os.getenv("SNAPSHOT_MODE", "").lower() == "shared"
+
+@dataclass
+class Snapshot:
+    generation: str                   # short content hash of the serialized document
+    body: Union[bytes, mmap.mmap]     # all.json exactly as stored (mmap in shared mode)
+    loaded_at: float
+    _data: Optional[Dict[str, Any]] = field(default=None, repr=False)
+    _derived: Dict[str, Any] = field(default_factory=dict, repr=False)
+    _lock: threading.RLock = field(default_factory=threading.RLock, repr=False)
+
+    @property
+    def data(self) -> Dict[str, Any]:
+        """Parsed all.json (parsed on first use when the snapshot was mapped)."""
+        if self._data is None:
+            with self._lock:
+                if self._data is None:
+                    data = loads(bytes(self.body))
+                    self._data = data if isinstance(data, dict) else {}
+        return self._data
+
+    def derived(self, name: str, builder: Callable[["Snapshot"], Any]) -> Any:
+        """
+        Return a structure derived from this snapshot, building it on first use.
+        Derived structures (indexes, encodings, ...) live and die with the snapshot.
+        """
+        try:
+            return self._derived[name]
+        except KeyError:
+            pass
+        with self._lock:
+            if name not in self._derived:
+                self._derived[name] = builder(self)
+            return self._derived[name]
+
+_current: Optional[Snapshot] = None
+_current_sig = None
+_load_lock = threading.Lock()
+_listeners: List[Callable[[Optional[Snapshot], Snapshot], None]] = []
+_publishing = False   # publish_shared is between installing a generation and bumping CURRENT
+
+def _generation_of(body: bytes) -> str:
+    return hashlib.sha1(body).hexdigest()[:12]
+
+def on_swap(callback: Callable[[Optional[Snapshot], Snapshot], None]) -> None:
+    """Register `callback(old, new)`, called whenever a new snapshot replaces the current one."""
+    _listeners.append(callback)
+
+def _swap(old: Optional[Snapshot], new: Snapshot) -> Snapshot:
+    for callback in _listeners:
+        try:
+            callback(old, new)
+        except Exception as e:
+            print(f"Snapshot listener failed: {e}")
+    return new
+
+def current_snapshot(path: str = ALL_FILE) -> Optional[Snapshot]:
+    """
+    Return the snapshot for the current contents of `path` (or of the current
+    shared generation in shared mode). Nothing is re-read while it is unchanged.
+    """
+    if SHARED:
+        return _current_shared()
+
+    global _current, _current_sig
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return _current
+    sig = (st.st_mtime_ns, st.st_size)
+    if _current is not None and sig == _current_sig:
+        return _current
+
+    with _load_lock:
+        if _current is not None and sig == _current_sig:
+            return _current
+        try:
+            with open(path, "rb") as f:
+                body = f.read()
+        except OSError as e:
+            print(f"Error loading snapshot from {path}: {e}")
+            return _current
+        old = _current
+        generation = _generation_of(body)
+        if old is not None and old.generation == generation:
+            # rewritten with identical content: keep the derived structures
+            _current_sig = sig
+            return old
+        try:
+            data = loads(body)
+        except json.JSONDecodeError as e:
+            print(f"Error loading snapshot from {path}: {e}")
+            return _current
+        if not isinstance(data, dict):
+            return _current
+        new = Snapshot(generation=generation, body=body, loaded_at=time.time(), _data=data)
+        _current, _current_sig = new, sig
+
+    return _swap(old, new)
+
+# -----------------------------------------------------------------------------
+# Shared mode
+# -----------------------------------------------------------------------------
+
+def _replace_atomically(path: str, payload: bytes) -> None:
+    tmp = f"{path}.tmp.{os.getpid()}"
+    with open(tmp, "wb") as f:
+        f.write(payload)
+    os.replace(tmp, path)
+
+def publish_shared(body: bytes) -> str:
+    """
+    Publish `body` as a new immutable generation and bump CURRENT. The generation
+    becomes the refresher's own current snapshot first, so swap listeners (webhooks,
+    deltas) have run for it by the time workers see it. Called by the refresher
+    process only. Returns the generation.
+    """
+    global _current, _current_sig, _publishing
+    os.makedirs(SHARED_DIR, exist_ok=True)
+    generation = _generation_of(body)
+    target = os.path.join(SHARED_DIR, f"all-{generation}.json")
+    if not os.path.exists(target):
+        _replace_atomically(target, body)
+
+    with _load_lock:
+        old, new = _current, None
+        if old is None or old.generation != generation:
+            new = Snapshot(generation=generation, body=body, loaded_at=time.time())
+            _current = new
+        _publishing = True   # CURRENT still names the old generation
+    try:
+        if new is not None:
+            _swap(old, new)
+    finally:
+        _replace_atomically(SHARED_CURRENT, generation.encode("ascii"))
+        with _load_lock:
+            st = os.stat(SHARED_CURRENT)
+            _current_sig = (st.st_mtime_ns, st.st_size)
+            _publishing = False
+
+    # prune old generations (unlinking a file that is still mapped is safe)
+    published = sorted(
+        (os.path.join(SHARED_DIR, n) for n in os.listdir(SHARED_DIR) if n.startswith("all-") and n.endswith(".json")),
+        key=os.path.getmtime, reverse=True,
+    )
+    for stale in published[SHARED_KEEP:]:
+        try:
+            os.remove(stale)
+        except OSError:
+            pass
+    return generation
+
+def _map_generation(generation: str) -> Optional[mmap.mmap]:
+    path = os.path.join(SHARED_DIR, f"all-{generation}.json")
+    try:
+        with open(path, "rb") as f:
+            return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError) as e:  # ValueError: empty file
+        print(f"Error mapping snapshot {path}: {e}")
+        return None
+
+def _current_shared() -> Optional[Snapshot]:
+    global _current, _current_sig
+    if _publishing:
+        return _current
+    try:
+        st = os.stat(SHARED_CURRENT)
+    except FileNotFoundError:
+        return _current
+    sig = (st.st_mtime_ns, st.st_size)
+    if _current is not None and sig == _current_sig:
+        return _current
+
+    with _load_lock:
+        if _current is not None and sig == _current_sig:
+            return _current
+        try:
+            with open(SHARED_CURRENT, "rb") as f:
+                generation = f.read().decode("ascii").strip()
+        except OSError:
+            return _current
+        old = _current
+        if old is not None and old.generation == generation:
+            _current_sig = sig
+            return old
+        body = _map_generation(generation)
+        if body is None:
+            return _current
+        new = Snapshot(generation=generation, body=body, loaded_at=time.time())
+        _current, _current_sig = new, sig
+
+    return _swap(old, new)
@@ -0,0 +1,140 @@
+import hashlib
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, NamedTuple, Optional
+
+from . import serializer
+
+# -----------------------------------------------------------------------------
+# Change feed for the stock: one refresh, many waiting clients
+# -----------------------------------------------------------------------------
+
+DEALERS = ("normal", "mirage")
+REFRESH_INTERVAL = int(os.environ.get("STOCK_STREAM_INTERVAL", "30"))
+
+def stock_diff(old: Optional[Dict[str, Any]], new: Dict[str, Any]) -> Dict[str, Dict[str, list]]:
+    """Per-dealer names added to / removed from the stock. Dealers without changes are omitted."""
+    out = {}
+    for dealer in DEALERS:
+        before = list((old or {}).get(dealer) or [])
+        after = list(new.get(dealer) or [])
+        added = [n for n in after if n not in before]
+        removed = [n for n in before if n not in after]
+        if added or removed:
+            out[dealer] = {"added": added, "removed": removed}
+    return out
+
+def stock_id(stock: Dict[str, Any]) -> str:
+    """
+    Content hash of the stock, used as its event/poll ID. Unlike a counter it means the
+    same in every worker and across restarts, so a client resuming with it never gets a
+    diff against a stock it did not see.
+    """
+    body = serializer.dumps({d: list(stock.get(d) or []) for d in DEALERS}, sort_keys=True)
+    return hashlib.sha1(body).hexdigest()[:16]
+
+class FeedState(NamedTuple):
+    id: str                             # stock_id of `stock`, "" before the first publish
+    stock: Optional[Dict[str, Any]]
+    diff: Dict[str, Any]                # from the stock with ID `base` to `stock`
+    base: str
+
+def sse_event(state: FeedState, last_id: str) -> str:
+    """The event for a client that last saw `last_id`: a diff when it is the diff's base, else a snapshot."""
+    if last_id and last_id == state.base:
+        payload = serializer.dumps({"version": state.id, "diff": state.diff, "stock": state.stock}).decode("utf-8")
+        return f"id: {state.id}\nevent: diff\ndata: {payload}\n\n"
+    payload = serializer.dumps({"version": state.id, "stock": state.stock}).decode("utf-8")
+    return f"id: {state.id}\nevent: snapshot\ndata: {payload}\n\n"
+
+def poll_body(state: FeedState, since: str) -> Dict[str, Any]:
+    """/stock/poll response for a client that last saw `since`."""
+    if state.id == since or state.stock is None:
+        return {"version": state.id, "changed": False}
+    out = {"version": state.id, "changed": True, "stock": state.stock}
+    if since and since == state.base:
+        out["diff"] = state.diff
+    return out
+
+class StockFeed:
+    """
+    Holds the last published stock, its ID and the diff from the stock before it.
+    Waiters block on a single condition variable and wake only when the stock changes.
+    """
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self.version = 0   # publishes in this process (for /metrics only)
+        self.id = ""
+        self.base = ""
+        self.stock: Optional[Dict[str, Any]] = None
+        self.last_diff: Dict[str, Any] = {}
+        self._refresher: Optional[threading.Thread] = None
+        self._listeners = []
+        self._wakers = []
+
+    def subscribe(self, callback: Callable[[Dict[str, Any], Dict[str, Any]], None]) -> None:
+        """Register `callback(diff, stock)`, called whenever a previously published stock changes."""
+        self._listeners.append(callback)
+
+    def on_publish(self, callback: Callable[[], None]) -> None:
+        """Register a no-argument `callback`, called after every version bump (used to wake async waiters)."""
+        self._wakers.append(callback)
+
+    def current(self) -> FeedState:
+        with self._cond:
+            return FeedState(self.id, self.stock, self.last_diff, self.base)
+
+    def publish(self, stock) -> Optional[Dict[str, Any]]:
+        """Publish a refreshed stock. Returns the diff, or None when nothing changed."""
+        if not isinstance(stock, dict) or not any(stock.get(d) for d in DEALERS):
+            return None
+        with self._cond:
+            if self.stock is not None and all(stock.get(d) == self.stock.get(d) for d in DEALERS):
+                return None
+            first = self.stock is None
+            diff = stock_diff(self.stock, stock)
+            self.stock = {d: list(stock.get(d) or []) for d in DEALERS}
+            self.last_diff = diff
+            self.base, self.id = self.id, stock_id(self.stock)
+            self.version += 1
+            self._cond.notify_all()
+            current = self.stock
+        for wake in self._wakers:
+            wake()
+        if first:
+            return diff
+        for callback in self._listeners:
+            try:
+                callback(diff, current)
+            except Exception as e:
+                print(f"Stock feed listener failed: {e}")
+        return diff
+
+    def wait(self, since: str, timeout: float) -> FeedState:
+        """Block until there is a stock whose ID differs from `since` (or timeout)."""
+        with self._cond:
+            self._cond.wait_for(lambda: self.id and self.id != since, timeout=timeout)
+            return FeedState(self.id, self.stock, self.last_diff, self.base)
+
+    def ensure_refresher(self, refresh: Callable[[], Any], interval: int = REFRESH_INTERVAL) -> None:
+        """Start (once) a daemon thread calling `refresh()` every `interval` seconds."""
+        if self._refresher is not None:
+            return
+        with self._cond:
+            if self._refresher is not None:
+                return
+
+            def loop():
+                while True:
+                    try:
+                        refresh()
+                    except Exception as e:
+                        print(f"Stock feed refresh failed: {e}")
+                    time.sleep(interval)
+
+            self._refresher = threading.Thread(target=loop, name="stock-feed", daemon=True)
+            self._refresher.start()
+
+stock_feed = StockFeed()
@@ -0,0 +1,98 @@
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from . import metrics
+
+# -----------------------------------------------------------------------------
+# Stock rotation schedule: refresh right after each dealer rotates
+# -----------------------------------------------------------------------------
+
+# dealer -> rotation period (s); rotations happen at UTC multiples of the period, plus the offset
+ROTATIONS = {
+    "normal": int(os.environ.get("STOCK_NORMAL_ROTATION", "14400")),
+    "mirage": int(os.environ.get("STOCK_MIRAGE_ROTATION", "7200")),
+}
+ROTATION_OFFSET = int(os.environ.get("STOCK_ROTATION_OFFSET", "0"))
+ROTATION_DELAY = float(os.environ.get("STOCK_ROTATION_DELAY", "5"))    # first fetch this long after a rotation
+BURST_INTERVAL = float(os.environ.get("STOCK_BURST_INTERVAL", "15"))   # retry interval until the new stock shows up
+BURST_TIMEOUT = float(os.environ.get("STOCK_BURST_TIMEOUT", "300"))    # give up (and idle) after this long
+
+BURST_FETCHES = metrics.Counter("stock_burst_fetches_total",
+                                "Stock fetches made after a rotation, by result (new/same/error).", ("result",))
+
+def last_rotation(now: float, dealer: Optional[str] = None) -> float:
+    """Most recent rotation instant <= now, of `dealer` or of any dealer."""
+    dealers = [dealer] if dealer else list(ROTATIONS)
+    return max(now - ((now - ROTATION_OFFSET) % ROTATIONS[d]) for d in dealers)
+
+def next_rotation(now: float) -> Tuple[float, List[str]]:
+    """(instant, dealers) of the next rotation after now."""
+    instants = {d: last_rotation(now, d) + ROTATIONS[d] for d in ROTATIONS}
+    when = min(instants.values())
+    return when, [d for d, t in instants.items() if t - when < 1]
+
+class StockScheduler:
+    """
+    Idles until just after the next rotation, then calls `fetch()` (a StockSnapshot, see
+    src/stock_scraper.py) every BURST_INTERVAL until every rotating dealer's stock differs
+    from what it was before the rotation (or BURST_TIMEOUT passes), hands the snapshot to
+    `publish(snapshot)` and idles again. `current()` returns the stock as it is now
+    (None when there is none yet).
+    """
+
+    def __init__(self, fetch: Callable[[], Any], publish: Callable[[Any], Any],
+                 current: Callable[[], Optional[Dict[str, Any]]]):
+        self.fetch = fetch
+        self.publish = publish
+        self.current = current
+        self.next: Optional[Tuple[float, List[str]]] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def burst(self, dealers: List[str], before: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """Fetch until the rotation shows up upstream. Returns the last stock fetched."""
+        before = before or {}
+        deadline = time.time() + BURST_TIMEOUT
+        stock = snap = None
+        while True:
+            try:
+                fetched = self.fetch()
+            except Exception as e:
+                BURST_FETCHES.inc("error")
+                print(f"Stock scheduler: fetch failed: {e}")
+            else:
+                names = {d: list(n) for d, n in fetched.names.items()} if fetched is not None else {}
+                if any(names.get(d) for d in ROTATIONS):
+                    snap, stock = fetched, names
+            if stock is not None and all(stock.get(d) != before.get(d) for d in dealers):
+                BURST_FETCHES.inc("new")
+                self.publish(snap)
+                return stock
+            if stock is not None:
+                BURST_FETCHES.inc("same")
+            if time.time() + BURST_INTERVAL > deadline:
+                if stock is not None:
+                    self.publish(snap)    # rotated into the same items, or upstream is that late
+                print(f"Stock scheduler: no new {'/'.join(dealers)} stock {BURST_TIMEOUT:.0f}s after the rotation")
+                return stock
+            time.sleep(BURST_INTERVAL)
+
+    def _loop(self) -> None:
+        while True:
+            when, dealers = self.next = next_rotation(time.time())
+            time.sleep(max(0.0, when - 1 - time.time()))
+            before = self.current()   # the outgoing rotation's stock
+            time.sleep(max(0.0, when + ROTATION_DELAY - time.time()))
+            try:
+                self.burst(dealers, before)
+            except Exception as e:
+                print(f"Stock scheduler: {e}")
+
+    def start(self) -> None:
+        """Start (once) the daemon thread."""
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._loop, name="stock-scheduler", daemon=True)
+                self._thread.start()
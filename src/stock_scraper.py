@@ -1,21 +1,36 @@
 import json
 import re
 from dataclasses import dataclass, asdict
+from functools import cached_property
 from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
 
 from bs4 import BeautifulSoup
-import requests
+
+from .manager import write_file
+from .images import image_cache
+from .metrics import span
+from . import recording
+from .profiling import profiled
 
 # -----------------------------
 # Utilities
 # -----------------------------
 
 URL_STOCK = "https://fruityblox.com/stock/"
+STOCK_FILE = "storage/stock.json"
+STOCK_DETAIL_FILE = "storage/stock_full.json"   # /stock?detail=full, always written with STOCK_FILE
+DEALERS = ("normal", "mirage")
+
+def fetch_html() -> str:
+    with span("fetch", "stock"):
+        resp = recording.get("stock", URL_STOCK, timeout=20)
+        resp.raise_for_status()
+        return resp.text
 
 def fetch_soup() -> BeautifulSoup:
-    resp = requests.get(URL_STOCK, timeout=20)
-    resp.raise_for_status()
-    return BeautifulSoup(resp.content, "html.parser")
+    html = fetch_html()
+    with span("parse", "stock"):
+        return BeautifulSoup(html, "html.parser")
 
 @dataclass
 class StockItem:
@@ -32,6 +47,33 @@ class StockItem:
     def to_dict(self) -> Dict[str, Any]:
         return asdict(self)
 
+@dataclass(frozen=True)
+class StockSnapshot:
+    """
+    Both dealers' stock from a single parse of the stock page.
+    The views below are derived from the items once, on first use.
+    """
+    normal: Tuple[StockItem, ...]
+    mirage: Tuple[StockItem, ...]
+
+    @classmethod
+    def from_state(cls, state: Dict[str, Any]) -> "StockSnapshot":
+        item_map = state.get("itemMap", {}) or {}
+        return cls(
+            normal=tuple(_item_to_stock(name, "Normal", item_map) for name in state.get("normal", [])),
+            mirage=tuple(_item_to_stock(name, "Mirage", item_map) for name in state.get("mirage", [])),
+        )
+
+    @cached_property
+    def names(self) -> Dict[str, List[str]]:
+        """{"normal": [names], "mirage": [names]} - the stock.json format."""
+        return {d: [it.name for it in getattr(self, d)] for d in DEALERS}
+
+    @cached_property
+    def detail(self) -> Dict[str, List[Dict[str, Any]]]:
+        """{"normal": [StockItem dicts], "mirage": [...]} - served by /stock?detail=full."""
+        return {d: [it.to_dict() for it in getattr(self, d)] for d in DEALERS}
+
 _SHORT_SUFFIXES = (
     (1_000_000_000, "b"),
     (1_000_000, "m"),
@@ -212,28 +254,40 @@ def parse_stock_from_soup(soup: Union[str, BeautifulSoup]) -> Dict[str, Any]:
     normal, mirage, item_map = _build_items_from_state(state)
     return {"normal": normal, "mirage": mirage, "itemMap": item_map}
 
+_parsed: Tuple[Any, Optional[StockSnapshot]] = (None, None)   # (page, snapshot) of the last parse
+
+def stock_snapshot(soup: Union[str, BeautifulSoup]) -> StockSnapshot:
+    """
+    The StockSnapshot of a stock page. The last page's snapshot is kept, so the
+    per-dealer helpers below parse a page once however many of them are called.
+    """
+    global _parsed
+    page, snap = _parsed
+    if page is not soup or snap is None:
+        snap = StockSnapshot.from_state(parse_stock_from_soup(soup))
+        _parsed = (soup, snap)
+    return snap
+
 def get_stock_normal(soup: Union[str, BeautifulSoup]) -> List[Dict[str, Any]]:
     """
     Return a list of Normal dealer stock items as dictionaries.
     Each dict has: name, dealer, image, money_price, robux_price, money_price_str, robux_price_str, slug, category
     """
-    state = parse_stock_from_soup(soup)
-    item_map = state.get("itemMap", {})
-    out: List[Dict[str, Any]] = []
-    for name in state.get("normal", []):
-        out.append(_item_to_stock(name, "Normal", item_map).to_dict())
-    return out
+    return list(stock_snapshot(soup).detail["normal"])
 
 def get_stock_mirage(soup: Union[str, BeautifulSoup]) -> List[Dict[str, Any]]:
     """
     Return a list of Mirage dealer stock items as dictionaries.
     """
-    state = parse_stock_from_soup(soup)
-    item_map = state.get("itemMap", {})
-    out: List[Dict[str, Any]] = []
-    for name in state.get("mirage", []):
-        out.append(_item_to_stock(name, "Mirage", item_map).to_dict())
-    return out
+    return list(stock_snapshot(soup).detail["mirage"])
+
+@profiled("get_stock_all")   # profile target name kept for /admin/profiles
+def fetch_stock() -> StockSnapshot:
+    """Fetch and parse the stock page, without side effects."""
+    html = fetch_html()
+    with span("parse", "stock"):
+        # the page is parsed as text: BeautifulSoup is only needed for the card fallback
+        return stock_snapshot(html)
 
 def get_stock_all() -> Dict[str, List[Dict[str, str]]]:
     """
@@ -243,24 +297,25 @@ def get_stock_all() -> Dict[str, List[Dict[str, str]]]:
       "mirage": [ { "name": "<item>" }, ... ]
     }
     """
-    soup = fetch_soup()
-    state = parse_stock_from_soup(soup)
+    return {d: list(names) for d, names in fetch_stock().names.items()}
 
-    normal_items = []
-    mirage_items = []
-
-    for name in state.get("normal", []):
-        normal_items.append(name)
-
-    for name in state.get("mirage", []):
-        mirage_items.append(name)
+def write_stock(snap: StockSnapshot) -> Dict[str, List[str]]:
+    """
+    Write both views of one parse: the names to STOCK_FILE and the full item records
+    (images pointed at the local image cache) to STOCK_DETAIL_FILE. Returns the names.
+    """
+    stock = {d: list(names) for d, names in snap.names.items()}
+    write_file(STOCK_DETAIL_FILE, image_cache.rewrite(snap.detail))
+    write_file(STOCK_FILE, stock)
+    return stock
 
-    return {"normal": normal_items, "mirage": mirage_items}
+def refresh_stock() -> Dict[str, List[str]]:
+    """Fetch the stock and write both files from that one parse."""
+    return write_stock(fetch_stock())
 
 # Optional: tiny helper to pull only names (handy for quick checks)
 def get_stock_names(soup: Union[str, BeautifulSoup]) -> Dict[str, List[str]]:
     """
     Return just the names for each dealer.
     """
-    state = parse_stock_from_soup(soup)
-    return {"normal": state.get("normal", []), "mirage": state.get("mirage", [])}
+    return {d: list(names) for d, names in stock_snapshot(soup).names.items()}
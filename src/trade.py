@@ -0,0 +1,131 @@
+from typing import Any, Dict, List, Optional, Tuple
+
+from .names import fruit_key, skin_key, gamepass_key
+from .snapshot import Snapshot
+
+# -----------------------------------------------------------------------------
+# Trade evaluation against the merged values of a snapshot
+# -----------------------------------------------------------------------------
+
+MAX_TRADES_PER_REQUEST = 10_000
+MAX_MEMO_ENTRIES = 50_000   # client-supplied specs; keep the memo bounded
+SIDES = ("give", "get")
+
+class PriceVector:
+    """
+    Flat list of values with a key -> slot map, built once per snapshot.
+
+    Keys:
+        ("fruit", fruit_key, "reg" | "perm")
+        ("skin", fruit_key, skin_key)
+        ("gamepass", gamepass_key)
+
+    Item specs seen in requests are memoized to their slot, so evaluating a batch
+    is mostly list indexing and integer addition.
+    """
+
+    def __init__(self, data: Dict[str, Any]):
+        self.values: List[int] = []
+        self.slots: Dict[Tuple, int] = {}
+        self._memo: Dict[Tuple, Optional[int]] = {}
+
+        for f in (data.get("fruits") or []):
+            name = f.get("name")
+            if not name: continue
+            fkey = fruit_key(name)
+            self._put(("fruit", fkey, "reg"), f.get("regValue"))
+            self._put(("fruit", fkey, "perm"), f.get("permValue"))
+            for s in (f.get("skins") or []):
+                if s.get("name"):
+                    self._put(("skin", fkey, skin_key(s["name"])), s.get("regValue"))
+        for g in (data.get("gamepasses") or []):
+            if g.get("name"):
+                self._put(("gamepass", gamepass_key(g["name"])), g.get("regValue"))
+
+    def _put(self, key: Tuple, value) -> None:
+        if key in self.slots:
+            return
+        self.slots[key] = len(self.values)
+        self.values.append(value if isinstance(value, int) else 0)
+
+    def slot(self, item) -> Optional[int]:
+        """
+        Resolve an item spec to its slot. Accepted specs:
+            "Leopard"                                         (regular fruit)
+            {"type": "fruit", "name": "Leopard", "perm": true}
+            {"type": "skin", "fruit": "East Dragon", "name": "Ember"}
+            {"type": "gamepass", "name": "2x Mastery"}
+        """
+        if isinstance(item, str):
+            item = {"type": "fruit", "name": item}
+        if not isinstance(item, dict):
+            return None
+        kind = item.get("type", "fruit")
+        spec = (kind, item.get("name"), item.get("fruit"), bool(item.get("perm")))
+        try:
+            return self._memo[spec]
+        except KeyError:
+            pass
+        except TypeError:
+            return None  # unhashable name/fruit
+
+        name, fruit = item.get("name") or "", item.get("fruit") or ""
+        if not isinstance(name, str) or not isinstance(fruit, str):
+            key = None
+        elif kind == "fruit":
+            key = ("fruit", fruit_key(name), "perm" if item.get("perm") else "reg")
+        elif kind == "skin":
+            key = ("skin", fruit_key(fruit), skin_key(name))
+        elif kind == "gamepass":
+            key = ("gamepass", gamepass_key(name))
+        else:
+            key = None
+        slot = self.slots.get(key) if key else None
+        if len(self._memo) < MAX_MEMO_ENTRIES:
+            self._memo[spec] = slot
+        return slot
+
+    def evaluate(self, trade: Dict[str, Any]) -> Dict[str, Any]:
+        """Return per-side totals, the difference (get - give) and unresolved items."""
+        values, totals, unresolved = self.values, {}, []
+        for side in SIDES:
+            total = 0
+            items = trade.get(side)
+            for i, item in enumerate(items if isinstance(items, list) else []):
+                slot = self.slot(item)
+                if slot is None:
+                    unresolved.append(f"{side}[{i}]")
+                    continue
+                total += values[slot] * (item.get("count", 1) if isinstance(item, dict) else 1)
+            totals[side] = total
+        return {
+            "give": totals["give"],
+            "get": totals["get"],
+            "difference": totals["get"] - totals["give"],
+            "unresolved": unresolved,
+        }
+
+def invalid_trade(trade: Any) -> Optional[Tuple[str, str]]:
+    """
+    (where, problem) for the first malformed part of a trade, e.g. ("give[2]", "'count'
+    must be a positive integer."), or None. `where` is "" when the trade itself is not an
+    object. Unknown names are not malformed: evaluate() reports them in `unresolved`.
+    """
+    if not isinstance(trade, dict):
+        return "", "a trade must be a JSON object."
+    for side in SIDES:
+        items = trade.get(side, [])
+        if not isinstance(items, list):
+            return side, "must be a list of items."
+        for i, item in enumerate(items):
+            if not isinstance(item, (str, dict)):
+                return f"{side}[{i}]", "an item must be a fruit name or an object."
+            if isinstance(item, dict) and "count" in item:
+                count = item["count"]
+                if not isinstance(count, int) or isinstance(count, bool) or count < 1:
+                    return f"{side}[{i}]", "'count' must be a positive integer."
+    return None
+
+def price_vector(snapshot: Snapshot) -> PriceVector:
+    """Return the (lazily built) price vector of a snapshot."""
+    return snapshot.derived("price_vector", lambda s: PriceVector(s.data))
@@ -0,0 +1,205 @@
+import os
+import queue
+import threading
+import time
+import uuid
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlparse
+
+from .manager import read_file, write_file
+from .lookup import entity_index
+from .snapshot import on_swap
+
+# -----------------------------------------------------------------------------
+# Outbound webhooks for stock and value changes
+# -----------------------------------------------------------------------------
+
+WEBHOOKS_FILE = "storage/webhooks.json"
+
+EVENT_STOCK_ROTATED = "stock.rotated"
+EVENT_VALUE_CHANGED = "fruit.value_changed"
+EVENT_SKIN_ADDED = "skin.added"
+EVENTS = (EVENT_STOCK_ROTATED, EVENT_VALUE_CHANGED, EVENT_SKIN_ADDED)
+
+DEFAULT_THRESHOLD_PCT = 10.0
+WORKERS = int(os.environ.get("WEBHOOK_WORKERS", "4"))
+QUEUE_SIZE = int(os.environ.get("WEBHOOK_QUEUE_SIZE", "1000"))
+MAX_ATTEMPTS = 4
+MIN_INTERVAL = float(os.environ.get("WEBHOOK_MIN_INTERVAL", "2"))   # seconds between deliveries per target
+TIMEOUT = 10
+
+# ---- registry ----
+
+_registry_lock = threading.Lock()
+
+def list_subscriptions() -> List[Dict[str, Any]]:
+    data = read_file(WEBHOOKS_FILE) if os.path.exists(WEBHOOKS_FILE) else []
+    return data if isinstance(data, list) else []
+
+def add_subscription(url: str, events: List[str], threshold: Optional[float] = None) -> Dict[str, Any]:
+    """Validate and persist a subscription. Raises ValueError on bad input."""
+    parsed = urlparse(url or "")
+    if parsed.scheme not in ("http", "https") or not parsed.netloc:
+        raise ValueError("'url' must be an absolute http(s) URL.")
+    events = list(events or EVENTS)
+    unknown = [e for e in events if e not in EVENTS]
+    if unknown:
+        raise ValueError(f"Unknown events: {unknown}. Known: {list(EVENTS)}.")
+    sub = {
+        "id": uuid.uuid4().hex[:12],
+        "url": url,
+        "events": events,
+        "threshold": float(threshold) if threshold is not None else DEFAULT_THRESHOLD_PCT,
+    }
+    with _registry_lock:
+        subs = list_subscriptions()
+        subs.append(sub)
+        write_file(WEBHOOKS_FILE, subs)
+    return sub
+
+def remove_subscription(sub_id: str) -> bool:
+    with _registry_lock:
+        subs = list_subscriptions()
+        kept = [s for s in subs if s.get("id") != sub_id]
+        if len(kept) == len(subs):
+            return False
+        write_file(WEBHOOKS_FILE, kept)
+        return True
+
+# ---- diff -> events ----
+
+def _pct_change(old, new) -> float:
+    if not isinstance(old, (int, float)) or not isinstance(new, (int, float)) or old == new:
+        return 0.0
+    if old == 0:
+        return 100.0
+    return (new - old) / old * 100.0
+
+def snapshot_events(old, new) -> List[Dict[str, Any]]:
+    """Value moves and new skins between two snapshots (threshold is applied per subscription)."""
+    if old is None:
+        return []
+    a, b = entity_index(old), entity_index(new)
+    events = []
+    for fkey, f in b.fruits.items():
+        prev = a.fruits.get(fkey)
+        if prev is None:
+            continue
+        for fld in ("regValue", "permValue"):
+            pct = _pct_change(prev.get(fld), f.get(fld))
+            if pct:
+                events.append({
+                    "event": EVENT_VALUE_CHANGED, "fruit": f.get("name"), "field": fld,
+                    "old": prev.get(fld), "new": f.get(fld), "changePct": round(pct, 2),
+                })
+    for key, s in b.skins.items():
+        if key not in a.skins:
+            events.append({"event": EVENT_SKIN_ADDED, "fruit": s.get("fruit"), "skin": s.get("name")})
+    return events
+
+def _wanted(sub: Dict[str, Any], ev: Dict[str, Any]) -> bool:
+    if ev["event"] not in (sub.get("events") or EVENTS):
+        return False
+    if ev["event"] == EVENT_VALUE_CHANGED:
+        return abs(ev["changePct"]) >= float(sub.get("threshold", DEFAULT_THRESHOLD_PCT))
+    return True
+
+# ---- delivery ----
+
+class Dispatcher:
+    """
+    Bounded pool of delivery threads fed by a bounded queue.
+    Producers never block: when the queue is full the batch is dropped and counted.
+    Each job is one batch of events for one target; failed posts are retried with
+    exponential backoff, and deliveries to the same target are spaced by MIN_INTERVAL.
+    """
+
+    def __init__(self, workers: int = WORKERS, queue_size: int = QUEUE_SIZE):
+        self._queue: "queue.Queue" = queue.Queue(maxsize=queue_size)
+        self._workers = workers
+        self._started = False
+        self._start_lock = threading.Lock()
+        self._next_slot: Dict[str, float] = {}
+        self._slot_lock = threading.Lock()
+        self.dropped = 0
+        self.delivered = 0
+        self.failed = 0
+
+    def _start(self) -> None:
+        with self._start_lock:
+            if self._started:
+                return
+            for i in range(self._workers):
+                threading.Thread(target=self._run, name=f"webhook-{i}", daemon=True).start()
+            self._started = True
+
+    def submit(self, url: str, events: List[Dict[str, Any]]) -> None:
+        if not events:
+            return
+        self._start()
+        try:
+            self._queue.put_nowait((url, events))
+        except queue.Full:
+            self.dropped += 1
+
+    def _wait_for_slot(self, url: str) -> None:
+        """Per-target rate limit: reserve the next free delivery slot and sleep until it."""
+        target = urlparse(url).netloc
+        with self._slot_lock:
+            now = time.monotonic()
+            at = max(now, self._next_slot.get(target, 0.0))
+            self._next_slot[target] = at + MIN_INTERVAL
+        if at > now:
+            time.sleep(at - now)
+
+    def _run(self) -> None:
+        while True:
+            url, events = self._queue.get()
+            try:
+                self._deliver(url, events)
+            finally:
+                self._queue.task_done()
+
+    def _deliver(self, url: str, events: List[Dict[str, Any]]) -> None:
+        import requests  # deferred: keeps it out of the web process import path
+        payload = {"sentAt": int(time.time()), "events": events}
+        delay = 1.0
+        for attempt in range(MAX_ATTEMPTS):
+            self._wait_for_slot(url)
+            try:
+                resp = requests.post(url, json=payload, timeout=TIMEOUT)
+                if resp.status_code < 400:
+                    self.delivered += 1
+                    return
+                if resp.status_code == 429:
+                    try: delay = max(delay, float(resp.headers.get("Retry-After", delay)))
+                    except ValueError: pass
+                elif resp.status_code < 500:
+                    break  # client errors will not fix themselves
+            except requests.RequestException:
+                pass
+            if attempt + 1 < MAX_ATTEMPTS:
+                time.sleep(delay)
+                delay *= 2
+        self.failed += 1
+        print(f"Webhook delivery to {url} failed after retries.")
+
+dispatcher = Dispatcher()
+
+def _fan_out(events: List[Dict[str, Any]]) -> None:
+    if not events:
+        return
+    for sub in list_subscriptions():
+        batch = [ev for ev in events if _wanted(sub, ev)]
+        dispatcher.submit(sub["url"], batch)
+
+def _on_snapshot_swap(old, new) -> None:
+    _fan_out(snapshot_events(old, new))
+
+def _on_stock_change(diff, stock) -> None:
+    _fan_out([{"event": EVENT_STOCK_ROTATED, "diff": diff, "stock": stock}])
+
+def install(stock_feed) -> None:
+    """Hook the dispatcher into snapshot swaps and the stock change feed."""
+    on_swap(_on_snapshot_swap)
+    stock_feed.subscribe(_on_stock_change)
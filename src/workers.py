@@ -0,0 +1,86 @@
+"""
+Multi-process deployment with a single refresher.
+
+    python -m src.workers refresher        # scrapes on schedule, publishes shared snapshots
+    python -m src.workers worker <port>    # waitress worker serving from the shared snapshot
+
+main.py starts one refresher and WORKERS waitress workers (SO_REUSEPORT on one port)
+when WORKERS > 1. Workers run with SNAPSHOT_MODE=shared and never scrape themselves.
+"""
+import os
+import socket
+import sys
+import time
+
+from .manager import read_file, write_file
+from .cadence import cadence_for
+
+REFRESH_POLL = int(os.environ.get("REFRESHER_POLL", "30"))
+
+def _jobs():
+    from .fruits_scraper_fruity import get_fruits
+    from .stock_scraper import refresh_stock
+    from .all import get_all
+    return [
+        # (file, ttl, refresh) - same starting TTLs as the routes in src/flask.py
+        ("storage/fruits.json", 7200, lambda: write_file("storage/fruits.json", get_fruits())),
+        ("storage/stock.json", 600, refresh_stock),
+        ("storage/all.json", 600, get_all),
+    ]
+
+def run_refresher() -> None:
+    """Keep every dataset fresh and publish storage/all.json as a shared generation."""
+    from .snapshot import publish_shared, ALL_FILE
+    from .stock_feed import stock_feed
+    from .stock_schedule import StockScheduler
+    from .stock_scraper import fetch_stock, write_stock
+    from . import webhooks, deltas
+
+    # change notifications and /all/diff deltas are produced here only, never in the workers
+    webhooks.install(stock_feed)
+    deltas.publish_history()
+    published = None
+    jobs = _jobs()
+    # new stock lands in stock.json right after each rotation; all.json follows on the next poll
+    if os.environ.get("STOCK_SCHEDULER", "True").lower() in ("true", "1", "t"):
+        StockScheduler(fetch_stock, write_stock,
+                       lambda: read_file("storage/stock.json")).start()
+    while True:
+        for path, ttl, refresh in jobs:
+            if not cadence_for(path, ttl).fresh():
+                try:
+                    refresh()
+                except Exception as e:
+                    print(f"Refresher: {path} failed: {e}")
+        stock_feed.publish(read_file("storage/stock.json"))
+        try:
+            with open(ALL_FILE, "rb") as f:
+                body = f.read()
+            if body and body != published:
+                print(f"Refresher: published generation {publish_shared(body)}")
+                published = body
+        except OSError as e:
+            print(f"Refresher: cannot publish {ALL_FILE}: {e}")
+        time.sleep(REFRESH_POLL)
+
+def run_worker(port: int) -> None:
+    """Serve src.flask:app with waitress on a SO_REUSEPORT socket shared with the other workers."""
+    os.environ["SNAPSHOT_MODE"] = "shared"
+    import waitress
+    from .flask import app
+
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+    sock.bind(("0.0.0.0", port))
+    sock.listen(1024)
+    waitress.serve(app, sockets=[sock], threads=int(os.environ.get("WAITRESS_THREADS", "16")))
+
+if __name__ == "__main__":
+    if len(sys.argv) >= 2 and sys.argv[1] == "refresher":
+        run_refresher()
+    elif len(sys.argv) >= 3 and sys.argv[1] == "worker":
+        run_worker(int(sys.argv[2]))
+    else:
+        print(__doc__)
+        sys.exit(2)